@@ -28,7 +28,11 @@ import signal
 from tkinter import Tk
 from tkinter.messagebox import showerror
 
+from schedulerlib.startup import phase, report_startup  # first: start time
 from schedulerlib.constants import PIDFILE, save_config
+from schedulerlib.stats_db import STATS_DB
+
+phase('constants')
 
 
 # parse command line arguments
@@ -42,6 +46,8 @@ parser.add_argument('-U', '--update-date',
 parser.add_argument('-W', '--withdraw',
                     help=_('start scheduler without displaying the manager window'),
                     action='store_true')
+parser.add_argument('--profile-startup', help=_('log the duration of the startup phases'),
+                    action='store_true')
 args = parser.parse_args()
 
 if args.version:
@@ -83,15 +89,26 @@ open(PIDFILE, 'w').write(pid)
 try:
     from schedulerlib.scheduler import EventScheduler
 
+    phase('modules')
     app = EventScheduler()
+    phase('initialization')
     if not args.withdraw:
         app.show()
+    if args.profile_startup:
+        app.after_idle(report_startup)
     app.mainloop()
 finally:
     try:
-        app.save()
-    except NameError:
+        app.flush()  # unsaved changes if mainloop exited abnormally
+    except (NameError, AttributeError):
+        pass
+    except Exception:
+        logging.exception('Error while saving the events')
+    try:
+        app.store.close()
+    except (NameError, AttributeError):
         pass
+    STATS_DB.close()
     save_config()
     try:
         os.unlink(PIDFILE)
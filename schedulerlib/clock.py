@@ -0,0 +1,133 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Drift-free clocks of the Timer and Pomodoro widgets
+"""
+from math import ceil
+from time import monotonic
+
+
+class Stopwatch:
+    """
+    Stopwatch measuring the elapsed time with the monotonic clock.
+
+    The displayed time is computed from the clock instead of being counted
+    tick by tick, so that it does not drift when the mainloop is busy.
+    """
+    def __init__(self):
+        self._origin = None  # monotonic time of elapsed() = 0 when running
+        self._elapsed = 0    # elapsed time when paused
+
+    @property
+    def running(self):
+        return self._origin is not None
+
+    def start(self):
+        if self._origin is None:
+            self._origin = monotonic() - self._elapsed
+
+    def pause(self):
+        if self._origin is not None:
+            self._elapsed = monotonic() - self._origin
+            self._origin = None
+
+    def reset(self):
+        """Stop and reset to 0."""
+        self._origin = None
+        self._elapsed = 0
+
+    def elapsed(self):
+        """Return the elapsed time in seconds."""
+        if self._origin is None:
+            return self._elapsed
+        return monotonic() - self._origin
+
+    def next_tick(self):
+        """Return the time (s) until the elapsed time reaches the next second."""
+        return 1 - self.elapsed() % 1
+
+
+class Countdown(Stopwatch):
+    """Countdown of duration seconds."""
+    def __init__(self, duration):
+        Stopwatch.__init__(self)
+        self.duration = duration
+
+    def remaining(self):
+        """Return the remaining time in whole seconds (rounded up), at least 0."""
+        return max(ceil(self.duration - self.elapsed()), 0)
+
+    def expired(self):
+        return self.elapsed() >= self.duration
+
+    def reset(self, duration=None):
+        """Stop and reset the countdown, to duration if not None."""
+        Stopwatch.reset(self)
+        if duration is not None:
+            self.duration = duration
+
+    def chain(self, duration):
+        """
+        Start a new countdown of duration seconds at the end of the current one.
+
+        The time elapsed since the end of the current countdown is not lost.
+        """
+        if self._origin is None:
+            self._elapsed -= self.duration
+        else:
+            self._origin += self.duration
+        self.duration = duration
+
+
+class TickSource:
+    """
+    Shared one-second tick of the running clocks.
+
+    A single timer of the dispatcher is scheduled for all the clocks, when
+    the next of them reaches a whole second, and all the callbacks are then
+    called.
+    """
+    def __init__(self, dispatcher):
+        self._dispatcher = dispatcher
+        self._clocks = {}  # callback: clock
+        self._timer = None
+
+    def add(self, callback, clock):
+        """Call callback at each second of clock (while it is running)."""
+        self._clocks[callback] = clock
+        self._schedule()
+
+    def remove(self, callback):
+        self._clocks.pop(callback, None)
+        self._schedule()
+
+    def _schedule(self):
+        self._dispatcher.cancel(self._timer)
+        self._timer = None
+        delays = [clock.next_tick() for clock in self._clocks.values() if clock.running]
+        if delays:
+            # 1 ms late rather than early
+            self._timer = self._dispatcher.call_later(min(delays) + 0.001, self._tick)
+
+    def _tick(self):
+        self._timer = None
+        for callback in list(self._clocks):
+            callback()
+        self._schedule()
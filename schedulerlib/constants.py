@@ -33,15 +33,15 @@ The images in ICONS were taken from "icons.tcl":
 Constants and functions.
 """
 import os
+import shutil
 import locale
 import logging
 from logging.handlers import TimedRotatingFileHandler
 from configparser import ConfigParser
 import warnings
 import gettext
+from importlib.util import find_spec
 from subprocess import check_output, CalledProcessError
-from tkinter import filedialog
-from tkinter import colorchooser
 
 from babel import dates
 
@@ -75,11 +75,12 @@ PATH_STATS = os.path.join(LOCAL_PATH, "pomodoro_stats.sqlite")
 PATH = os.path.dirname(__file__)
 PIDFILE = os.path.join(LOCAL_PATH, 'scheduler.pid')
 
-DATA_PATH = os.path.join(LOCAL_PATH, 'data')
+DATA_PATH = os.path.join(LOCAL_PATH, 'data')  # legacy pickle database
 BACKUP_PATH = os.path.join(LOCAL_PATH, 'backup', 'data.backup%i')
+DB_PATH = os.path.join(LOCAL_PATH, 'events.sqlite')
+DB_BACKUP_PATH = os.path.join(LOCAL_PATH, 'backup', 'events.backup%i')
 CONFIG_PATH = os.path.join(LOCAL_PATH, 'scheduler.ini')
 LOG_PATH = os.path.join(LOCAL_PATH, 'scheduler.log')
-NOTIF_PATH = os.path.join(PATH, 'notif.py')
 JOBSTORE = os.path.join(LOCAL_PATH, 'scheduler.sqlite')
 
 if not os.path.exists(LOCAL_PATH):
@@ -476,35 +477,26 @@ TASK_REV_TRANSLATION = {_(task): task for task in TASK_STATE}
 
 
 # --- system tray icon
-def get_available_gui_toolkits():
-    """Check which gui toolkits are available to create a system tray icon."""
-    toolkits = {'gtk': True, 'qt': True, 'tk': True}
-    b = False
-    try:
-        import gi
-        b = True
-    except ImportError:
-        toolkits['gtk'] = False
+def get_available_gui_toolkits(cache=True):
+    """
+    Check which gui toolkits are available to create a system tray icon.
 
-    try:
-        import PyQt5
-        b = True
-    except ImportError:
-        try:
-            import PyQt4
-            b = True
-        except ImportError:
-            try:
-                import PySide
-                b = True
-            except ImportError:
-                toolkits['qt'] = False
-
-    tcl_packages = check_output(["tclsh",
-                                 os.path.join(PATH, "packages.tcl")]).decode().strip().split()
-    toolkits['tk'] = "tktray" in tcl_packages
-    b = b or toolkits['tk']
-    if not b:
+    The python modules are looked for without being imported. Since listing
+    the tcl packages requires to run tclsh, the availability of tktray is
+    stored in the config and only checked at the first start, or when cache
+    is False.
+    """
+    toolkits = {'gtk': find_spec('gi') is not None,
+                'qt': any(find_spec(m) is not None for m in ('PyQt5', 'PyQt4', 'PySide'))}
+    tktray = CONFIG.get('General', 'tktray', fallback='')
+    if cache and tktray:
+        toolkits['tk'] = tktray == 'True'
+    else:
+        tcl_packages = check_output(["tclsh",
+                                     os.path.join(PATH, "packages.tcl")]).decode().strip().split()
+        toolkits['tk'] = "tktray" in tcl_packages
+        CONFIG.set('General', 'tktray', str(toolkits['tk']))
+    if not any(toolkits.values()):
         raise ImportError("No GUI toolkits available to create the system tray icon.")
     return toolkits
 
@@ -580,23 +572,14 @@ def info_trace(variable):
 
 
 # --- alternative filebrowser / colorchooser
-ZENITY = False
+ZENITY = None  # looked for at the first use
 
-tkfb = False
-try:
-    import tkfilebrowser as tkfb
-except ImportError:
-    tkfb = False
-try:
-    import tkcolorpicker as tkcp
-except ImportError:
-    tkcp = False
 
-if os.name != "nt":
-    paths = os.environ['PATH'].split(":")
-    for path in paths:
-        if os.path.exists(os.path.join(path, "zenity")):
-            ZENITY = True
+def zenity_available():
+    global ZENITY
+    if ZENITY is None:
+        ZENITY = os.name != "nt" and shutil.which("zenity") is not None
+    return ZENITY
 
 
 def askopenfilename(filetypes, initialdir, initialfile="", defaultextension="",
@@ -609,6 +592,11 @@ def askopenfilename(filetypes, initialdir, initialfile="", defaultextension="",
         - initialdir: directory where the filebrowser is opened
         - filetypes: [('NOM', '*.ext'), ...]
     """
+    from tkinter import filedialog
+    try:
+        import tkfilebrowser as tkfb
+    except ImportError:
+        tkfb = False
     filetypes2 = [(name, exts.replace('|', ' ')) for name, exts in filetypes]
     if tkfb:
         return tkfb.askopenfilename(title=title,
@@ -617,7 +605,7 @@ def askopenfilename(filetypes, initialdir, initialfile="", defaultextension="",
                                     initialdir=initialdir,
                                     initialfile=initialfile,
                                     **options)
-    elif ZENITY:
+    elif zenity_available():
         try:
             args = ["zenity", "--file-selection",
                     "--filename", os.path.join(initialdir, initialfile)]
@@ -653,13 +641,18 @@ def askcolor(color=None, **options):
 
     return the chose color in #rrggbb format.
     """
+    from tkinter import colorchooser
+    try:
+        import tkcolorpicker as tkcp
+    except ImportError:
+        tkcp = False
     if tkcp:
         color = tkcp.askcolor(color, **options)
         if color:
             return color[1]
         else:
             return None
-    elif ZENITY:
+    elif zenity_available():
         try:
             args = ["zenity", "--color-selection", "--show-palette"]
             if "title" in options:
@@ -694,16 +687,16 @@ def askcolor(color=None, **options):
 def backup():
     nb_backup = CONFIG.getint('General', 'backups')
     backups = [int(f.split(".")[-1][6:])
-               for f in os.listdir(os.path.dirname(BACKUP_PATH))
-               if f[:11] == "data.backup"]
+               for f in os.listdir(os.path.dirname(DB_BACKUP_PATH))
+               if f[:13] == "events.backup"]
     try:
         if len(backups) < nb_backup:
-            os.rename(DATA_PATH, BACKUP_PATH % len(backups))
+            shutil.copyfile(DB_PATH, DB_BACKUP_PATH % len(backups))
         else:
-            os.remove(BACKUP_PATH % 0)
+            os.remove(DB_BACKUP_PATH % 0)
             for i in range(1, len(backups)):
-                os.rename(BACKUP_PATH % i, BACKUP_PATH % (i - 1))
-            os.rename(DATA_PATH, BACKUP_PATH % (nb_backup - 1))
+                os.rename(DB_BACKUP_PATH % i, DB_BACKUP_PATH % (i - 1))
+            shutil.copyfile(DB_PATH, DB_BACKUP_PATH % (nb_backup - 1))
     except FileNotFoundError:
         pass
 
@@ -0,0 +1,237 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Shared timer of the periodic tasks of the application and integration of
+the tray icon event loop
+"""
+import logging
+from tkinter import READABLE
+from heapq import heappush, heappop
+from itertools import count
+from math import ceil
+from time import monotonic
+
+
+class _Timer:
+    __slots__ = ('callback', 'args', 'interval', 'when', 'cancelled')
+
+    def __init__(self, when, callback, args, interval=None):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+
+class Dispatcher:
+    """
+    Single after() loop running all the timed callbacks of the application.
+
+    The callbacks are kept in a heap sorted by due time (monotonic clock) and
+    only one after() is scheduled, for the earliest of them. The due times
+    are rounded up to the resolution so that the callbacks due in the same
+    slot are run by the same wakeup, never early. Nothing is scheduled when
+    there is no callback.
+
+    The numbers of wakeups and of calls are kept in the wakeups and calls
+    attributes to profile the idle activity of the application.
+    """
+    def __init__(self, widget, resolution=0.01):
+        self._widget = widget
+        self.resolution = resolution
+        self._heap = []  # (when, n, timer)
+        self._count = count()
+        self._after_id = None
+        self._due = None  # due time of the scheduled wakeup
+        self.wakeups = 0
+        self.calls = 0
+
+    def _round(self, when):
+        return ceil(when / self.resolution) * self.resolution
+
+    def _push(self, timer):
+        heappush(self._heap, (timer.when, next(self._count), timer))
+
+    def call_at(self, when, callback, *args):
+        """Call callback(*args) at the monotonic time when, return the timer."""
+        timer = _Timer(self._round(when), callback, args)
+        self._push(timer)
+        self._schedule()
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        """Call callback(*args) in delay seconds, return the timer."""
+        return self.call_at(monotonic() + delay, callback, *args)
+
+    def call_every(self, interval, callback, *args):
+        """Call callback(*args) every interval seconds, return the timer."""
+        timer = _Timer(self._round(monotonic() + interval), callback, args, interval)
+        self._push(timer)
+        self._schedule()
+        return timer
+
+    def cancel(self, timer):
+        """Cancel timer (None is ignored)."""
+        if timer is not None and not timer.cancelled:
+            timer.cancelled = True
+            self._schedule()
+
+    def stop(self):
+        """Cancel all the timers."""
+        for when, n, timer in self._heap:
+            timer.cancelled = True
+        self._heap.clear()
+        self._schedule()
+
+    def _schedule(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heappop(heap)
+        when = heap[0][0] if heap else None
+        if when == self._due:
+            return
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._due = when
+        if when is not None:
+            delay = max(int(ceil((when - monotonic()) * 1000)), 0)
+            self._after_id = self._widget.after(delay, self._wakeup)
+
+    def _wakeup(self):
+        self._after_id = None
+        self._due = None
+        self.wakeups += 1
+        now = monotonic()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timer = heappop(heap)[2]
+            if timer.cancelled:
+                continue
+            if timer.interval is None:
+                timer.cancelled = True  # done
+            else:
+                timer.when += timer.interval
+                if timer.when <= now:  # late: skip the missed calls
+                    timer.when = self._round(now + timer.interval)
+                self._push(timer)
+            self.calls += 1
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                logging.exception('Error in timer callback %r', timer.callback)
+        self._schedule()
+
+
+class EventPump:
+    """
+    Run the event loop of the tray icon's toolkit inside tkinter mainloop.
+
+    If the icon gives the file descriptors of its event sources (poll_fds
+    method), they are watched with createfilehandler and the loop only runs
+    when one of them is readable or when the toolkit's next timeout expires
+    (capped to watch_timeout seconds), so that nothing runs while the
+    application is idle and the toolkit has no pending timeout.
+
+    Otherwise (or if no file descriptor is given), the loop is polled with an
+    interval doubling from min_interval up to max_interval while there is no
+    event.
+    """
+    def __init__(self, dispatcher, widget, icon, min_interval=0.01, max_interval=0.25,
+                 watch_timeout=30):
+        self._dispatcher = dispatcher
+        self._tk = widget.tk
+        self._icon = icon
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.watch_timeout = watch_timeout
+        self._interval = min_interval
+        self._timer = None
+        self._fds = set()
+        self._idle_wakeups = 0  # consecutive readable fds without events
+
+    def start(self):
+        if hasattr(self._icon, 'poll_fds') and hasattr(self._tk, 'createfilehandler'):
+            self._rewatch()
+        else:
+            self._poll()
+
+    def stop(self):
+        self._dispatcher.cancel(self._timer)
+        self._timer = None
+        self._unwatch()
+
+    # --- file descriptor watching
+    def _unwatch(self):
+        for fd in self._fds:
+            self._tk.deletefilehandler(fd)
+        self._fds.clear()
+
+    def _rewatch(self):
+        try:
+            self._watch()
+        except Exception:
+            logging.exception('Cannot watch the tray icon event sources, polling them instead.')
+            self.stop()
+            self._poll()
+
+    def _watch(self):
+        fds, timeout = self._icon.poll_fds()
+        fds = set(fds)
+        if not fds:
+            raise ValueError('No event source to watch')
+        for fd in self._fds - fds:
+            self._tk.deletefilehandler(fd)
+            self._fds.discard(fd)
+        for fd in fds - self._fds:
+            self._tk.createfilehandler(fd, READABLE, self._on_readable)
+            self._fds.add(fd)
+        self._dispatcher.cancel(self._timer)
+        if timeout < 0:  # no pending timeout in the toolkit
+            self._timer = None
+        else:
+            self._timer = self._dispatcher.call_later(min(timeout / 1000, self.watch_timeout),
+                                                      self._run)
+
+    def _on_readable(self, fd, mask):
+        if self._icon.loop():
+            self._idle_wakeups = 0
+        else:
+            self._idle_wakeups += 1
+            if self._idle_wakeups > 100:
+                # the toolkit does not consume the fd: avoid a busy loop
+                logging.warning('Tray icon event sources always readable, polling them instead.')
+                self.stop()
+                self._poll()
+                return
+        self._rewatch()
+
+    def _run(self):
+        self._timer = None
+        self._icon.loop()
+        self._rewatch()
+
+    # --- polling
+    def _poll(self):
+        if self._icon.loop():
+            self._interval = self.min_interval
+        else:
+            self._interval = min(2 * self._interval, self.max_interval)
+        self._timer = self._dispatcher.call_later(self._interval, self._poll)
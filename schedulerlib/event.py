@@ -20,15 +20,18 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 Event class
 """
-from subprocess import run
 from datetime import timedelta, datetime, time
 
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.jobstores.base import JobLookupError
 
-from schedulerlib.constants import NOTIF_PATH, TASK_STATE, CONFIG,\
+from schedulerlib.constants import TASK_STATE, CONFIG,\
     format_date, format_datetime
+from schedulerlib.recurrence import occurrences, last_occurrence
+from schedulerlib.notifier import notify
+
+_UNKNOWN = object()  # last date not computed yet
 
 
 class Event:
@@ -43,6 +46,8 @@ class Event:
                     'Category': CONFIG.options('Categories')[0]}
         defaults.update(kw)
         self._properties = defaults
+        self._last_date = _UNKNOWN
+        self._sort_keys = {}
         self.iid = iid
 
     def __str__(self):
@@ -55,6 +60,7 @@ class Event:
             raise AttributeError("Event object has no attribute %s." % item)
 
     def __setitem__(self, item, value):
+        self._sort_keys.pop(item, None)
         if item in ['Summary', 'Place', 'Description', 'Category']:
             self._properties[item] = str(value)
         elif item in ['Start', 'End']:
@@ -62,10 +68,13 @@ class Event:
                 self._properties[item] = value
             else:
                 self._properties[item] = datetime.strptime(value, '%Y-%m-%d %H:%M')
+            if item == 'Start':
+                self._last_date = _UNKNOWN
         elif item == 'WholeDay':
             self._properties[item] = bool(value)
         elif item == 'Repeat':
             self._properties[item] = value
+            self._last_date = _UNKNOWN
         elif item == 'Task':
             vals = [False]
             vals.extend(TASK_STATE.keys())
@@ -79,7 +88,8 @@ class Event:
         else:
             raise AttributeError("Event object has no attribute %s." % item)
 
-    def reminder_add(self, date):
+    def _reminder_trigger(self, date):
+        """Return the trigger of the reminder at date."""
         repeat = self._properties['Repeat']
 
         if repeat:
@@ -89,33 +99,16 @@ class Event:
             cron_prop['minute'] = date.minute
             cron_prop['second'] = date.second
             cron_prop['year'] = '*'
-            if repeat['Limit'] == 'until':
-                end = repeat['EndDate']
-                cron_prop['end_date'] = date.replace(year=end.year,
-                                                     month=end.month,
-                                                     day=end.day)
-            elif repeat['Limit'] == 'after':
-                nb = repeat['NbTimes'] - 1  # date is the first time
-                if repeat['Frequency'] == 'year':
-                    cron_prop['end_date'] = date.replace(year=date.year + nb) + timedelta(hours=1)
-                elif repeat['Frequency'] == 'month':
-                    m = date.month + nb
-                    month = m % 12
-                    year = date.year + m // 12
-                    cron_prop['end_date'] = date.replace(year=year, month=month) + timedelta(hours=1)
-                else:
-                    start_day = date.isocalendar()[2] - 1
-                    week_days = [(x - start_day) % 7 for x in repeat['WeekDays']]
-
-                    nb_per_week = len(repeat['WeekDays'])
-                    nb_week = nb // nb_per_week
-                    rem = nb % nb_per_week
-                    cron_prop['end_date'] = date + timedelta(days=(7 * nb_week + week_days[rem] + 1))
-            else:
+            # shift between the reminder and the event occurrence
+            offset = date.date() - self['Start'].date()
+            last = self.get_last_date()
+            if last is None:
                 cron_prop['end_date'] = None
+            else:
+                cron_prop['end_date'] = datetime.combine(last, date.time()) + offset
 
             if repeat['Frequency'] == 'week':
-                cron_prop['day_of_week'] = ','.join([str(i) for i in repeat['WeekDays']])
+                cron_prop['day_of_week'] = ','.join([str((i + offset.days) % 7) for i in repeat['WeekDays']])
                 cron_prop['month'] = '*'
             elif repeat['Frequency'] == 'month':
                 cron_prop['day'] = date.day
@@ -124,19 +117,47 @@ class Event:
                 cron_prop['day'] = date.day
                 cron_prop['month'] = date.month
 
-            job = self.scheduler.add_job(run, trigger=CronTrigger(**cron_prop),
-                                         args=(['python3', NOTIF_PATH, str(self)],))
+            return CronTrigger(**cron_prop)
         else:
-            job = self.scheduler.add_job(run, trigger=DateTrigger(date),
-                                         args=(['python3', NOTIF_PATH, str(self)],))
+            return DateTrigger(date)
+
+    def reminder_add(self, date):
+        job = self.scheduler.add_job(notify, trigger=self._reminder_trigger(date),
+                                     args=(str(self),))
         self._properties['Reminders'][job.id] = date
 
     def reminder_remove(self, job_id):
         try:
             self.scheduler.remove_job(job_id)
-            del(self._properties['Reminders'][job_id])
-        except (JobLookupError, KeyError):
+        except JobLookupError:
             pass
+        self._properties['Reminders'].pop(job_id, None)
+
+    def set_reminders(self, dates, jobs=None):
+        """
+        Replace the reminders by the ones at dates, return whether they changed.
+
+        Only the jobs whose date, trigger or text changed are replaced.
+        jobs is the {job_id: job} dictionary of the scheduled reminders, they
+        are looked up if it is None.
+        """
+        text = (str(self),)
+        todo = list(dates)
+        changed = False
+        for job_id, date in list(self._properties['Reminders'].items()):
+            if jobs is None:
+                job = self.scheduler.get_job(job_id)
+            else:
+                job = jobs.get(job_id)
+            if (date in todo and job is not None and tuple(job.args) == text
+                    and repr(job.trigger) == repr(self._reminder_trigger(date))):
+                todo.remove(date)
+            else:
+                self.reminder_remove(job_id)
+                changed = True
+        for date in todo:
+            self.reminder_add(date)
+        return changed or bool(todo)
 
     def reminder_remove_all(self):
         ids = list(self._properties['Reminders'].keys())
@@ -162,36 +183,27 @@ class Event:
         start = self['Start']
         return time(hour=start.hour, minute=start.minute, second=start.second)
 
+    def get_sort_key(self, item):
+        """ Return the key used to sort the events by item (cached) """
+        try:
+            return self._sort_keys[item]
+        except KeyError:
+            key = self._properties[item]
+            if isinstance(key, str):
+                key = key.casefold()
+            self._sort_keys[item] = key
+            return key
+
     def get_last_date(self):
-        """ Return the start date of the last occurence of the event """
-        repeat = self['Repeat']
-        if not repeat:
-            return self['Start']
-        else:
-            freq = repeat['Frequency']
-            date = self['Start']
-            if repeat['Limit'] == 'until':
-                end = repeat['EndDate']
-            elif repeat['Limit'] == 'after':
-                nb = repeat['NbTimes'] - 1  # date is the first time
-                if freq == 'year':
-                    end = date.replace(year=date.year + nb)
-                elif freq == 'month':
-                    m = date.month + nb
-                    month = m % 12
-                    year = date.year + m // 12
-                    end = date.replace(year=year, month=month)
-                else:
-                    start_day = date.isocalendar()[2] - 1
-                    week_days = [(x - start_day) % 7 for x in repeat['WeekDays']]
-
-                    nb_per_week = len(repeat['WeekDays'])
-                    nb_week = nb // nb_per_week
-                    rem = nb % nb_per_week
-                    end = date + self.timedelta(days=(7 * nb_week + week_days[rem] + 1))
-                return end
-            else:
-                return None
+        """ Return the start date of the last occurence of the event (None if endless) """
+        if self._last_date is _UNKNOWN:
+            self._last_date = last_occurrence(self['Start'], self['Repeat'])
+        return self._last_date
+
+    def get_occurrences(self, after=None, before=None):
+        """ Yield the start dates of the occurences of the event between after and before """
+        return occurrences(self['Start'], self['Repeat'], after, before,
+                           self.get_last_date())
 
     def keys(self):
         return self._properties.keys()
@@ -28,6 +28,7 @@ from tkcalendar import Calendar
 
 from schedulerlib.constants import HOLIDAYS, CONFIG, format_date, format_time
 from schedulerlib.tooltip import TooltipWrapper
+from schedulerlib.event_index import EventIndex
 
 
 class EventCalendar(Calendar):
@@ -49,6 +50,9 @@ class EventCalendar(Calendar):
 
             tooltipforeground, tooltipbackground, tooltipalpha
 
+            index: EventIndex of the displayed events (shared with the
+                   application), a new one is created if not given
+
         selectmode is set to 'none' and cannot be changed
         """
         tp_fg = kw.pop('tooltipforeground', 'white')
@@ -56,8 +60,9 @@ class EventCalendar(Calendar):
         tp_alpha = kw.pop('tooltipalpha', 0.8)
         kw['selectmode'] = 'none'
 
-        self._events = {}
-        self._weekly_events = {i: [] for i in range(7)}
+        self._index = kw.pop('index', None)
+        if self._index is None:
+            self._index = EventIndex()
         self._events_tooltips = [[None for i in range(7)] for j in range(6)]
 
         Calendar.__init__(self, master, class_='EventCalendar', **kw)
@@ -149,6 +154,9 @@ class EventCalendar(Calendar):
         we_style = 'we.%s.TLabel' % self._style_prefixe
         we_om_style = 'we_om.%s.TLabel' % self._style_prefixe
 
+        occurrences = self._index.get_events_between(cal[0][0], cal[-1][-1])
+        events = self._index.events
+
         # --- display events and holidays
         for w in range(6):
             for d in range(7):
@@ -156,38 +164,17 @@ class EventCalendar(Calendar):
                 label = self._calendar[w][d]
                 if not label.cget('text'):
                     continue
-                date = day.strftime('%Y/%m/%d')
                 # --- holidays
-                if date in HOLIDAYS:
+                if day.strftime('%Y/%m/%d') in HOLIDAYS:
                     if month == day.month:
                         label.configure(style=we_style)
                     else:
                         label.configure(style=we_om_style)
-                # --- one time event
-                if date in self._events:
-                    evts = self._events[date]
-                    txt = '\n'.join([k[0] for k in evts])
-                    cat = evts[-1][-1]
-                    self._add_to_tooltip(w, d, txt, cat)
-                # --- yearly event
-                date = day.strftime('*/%m/%d')
-                if date in self._events:
-                    evts = self._events[date]
-                    for desc, iid, start, end, cat in evts:
-                        if day >= start and (end is None or day <= end):
-                            self._add_to_tooltip(w, d, desc, cat)
-                # --- monthly event
-                date = day.strftime('*/*/%d')
-                if date in self._events:
-                    evts = self._events[date]
-                    for desc, iid, start, end, cat in evts:
-                        if day >= start and (end is None or day <= end):
-                            self._add_to_tooltip(w, d, desc, cat)
-                # --- weekly events
-                evts = self._weekly_events[d]
-                for desc, iid, start, end, cat in evts:
-                    if day >= start and (end is None or day <= end):
-                        self._add_to_tooltip(w, d, desc, cat)
+                # --- events
+                iids = occurrences.get(day)
+                if iids:
+                    txt = '\n'.join([self._get_desc(events[iid]) for iid in iids])
+                    self._add_to_tooltip(w, d, txt, events[iids[-1]]['Category'])
         self._display_selection()
 
     def _add_to_tooltip(self, week_nb, day, txt, cat):
@@ -203,269 +190,14 @@ class EventCalendar(Calendar):
         else:
             tp.configure(text='\n'.join([tp.cget('text'), txt]))
 
-    def _remove_from_tooltip(self, date, txt):
-        y1, y2 = date.year, self._date.year
-        m1, m2 = date.month, self._date.month
-        if y1 == y2 or (y1 - y2 == 1 and m1 == 1 and m2 == 12) or (y2 - y1 == 1 and m2 == 1 and m1 == 12):
-            _, week_nb, d = date.isocalendar()
-            d -= 1
-            week_nb -= self._date.isocalendar()[1]
-            week_nb %= 52
-            if week_nb < 6:
-                tp = self._events_tooltips[week_nb][d]
-                if tp is not None:
-                    text = tp.cget('text').split('\n')
-                    try:
-                        text.remove(txt)
-                    except ValueError:
-                        return
-                    if text:
-                        tp.configure(text='\n'.join(text))
-                    else:
-                        tp.destroy()
-                        self._events_tooltips[week_nb][d] = None
-                        label = self._calendar[week_nb][d]
-                        if type(date) == datetime:
-                            date = date.date()
-                        if date == self._sel_date:
-                            label.configure(style='sel.%s.TLabel' % self._style_prefixe)
-                        elif date.strftime('%Y/%m/%d') in HOLIDAYS:
-                            if m1 == m2:
-                                label.configure(style='we.%s.TLabel' % self._style_prefixe)
-                            else:
-                                label.configure(style='we_om.%s.TLabel' % self._style_prefixe)
-                        else:
-                            if m1 == m2:
-                                if d < 5:
-                                    label.configure(style='normal.%s.TLabel' % self._style_prefixe)
-                                else:
-                                    label.configure(style='we.%s.TLabel' % self._style_prefixe)
-                            else:
-                                if d < 5:
-                                    label.configure(style='normal_om.%s.TLabel' % self._style_prefixe)
-                                else:
-                                    label.configure(style='we_om.%s.TLabel' % self._style_prefixe)
-
-    def _show_event(self, date, txt, cat):
-        y1, y2 = date.year, self._date.year
-        m1, m2 = date.month, self._date.month
-        if y1 == y2 or (y1 - y2 == 1 and m1 == 1 and m2 == 12) or (y2 - y1 == 1 and m2 == 1 and m1 == 12):
-            _, w, d = date.isocalendar()
-            w -= self._date.isocalendar()[1]
-            w %= 52
-            if w < 6:
-                self._add_to_tooltip(w, d - 1, txt, cat)
-
-    def _add_event(self, date, desc, iid, repeat, cat):
-        year, month, day = date.year, date.month, date.day
-        if not repeat:
-            date2 = date.strftime('%Y/%m/%d')
-            if date2 not in self._events:
-                self._events[date2] = []
-            self._events[date2].append((desc, iid, cat))
-            self._show_event(date, desc, cat)
+    def _get_desc(self, event):
+        """Return the text describing event in the tooltips and menus."""
+        if not event["WholeDay"]:
+            deb = format_time(event['Start'], locale=self["locale"])
+            fin = format_time(event['End'], locale=self["locale"])
+            return '➢ %s - %s %s' % (deb, fin, event['Summary'])
         else:
-            start = date.date()
-            freq = repeat['Frequency']
-            if repeat['Limit'] == 'until':
-                end = repeat['EndDate']
-            elif repeat['Limit'] == 'after':
-                nb = repeat['NbTimes'] - 1  # date is the first time
-                if freq == 'year':
-                    end = date.replace(year=date.year + nb)
-                elif freq == 'month':
-                    m = date.month + nb
-                    month = m % 12
-                    year = date.year + m // 12
-                    end = date.replace(year=year, month=month)
-                else:
-                    start_day = date.isocalendar()[2] - 1
-                    week_days = [(x - start_day) % 7 for x in repeat['WeekDays']]
-
-                    nb_per_week = len(repeat['WeekDays'])
-                    nb_week = nb // nb_per_week
-                    rem = nb % nb_per_week
-                    end = date + self.timedelta(days=(7 * nb_week + week_days[rem] + 1))
-                end = end.date()
-            else:
-                end = None
-            if freq == 'year':
-                date2 = date.strftime('*/%m/%d')
-                if date2 not in self._events:
-                    self._events[date2] = []
-                self._events[date2].append((desc, iid, start, end, cat))
-                ev_date = self.date(self._date.year, month, day)
-                if (end is None or ev_date <= end) and (ev_date >= start):
-                    self._show_event(ev_date, desc, cat)
-
-            elif freq == 'month':
-                date2 = date.strftime('*/*/%d')
-                if date2 not in self._events:
-                    self._events[date2] = []
-                self._events[date2].append((desc, iid, start, end, cat))
-                # previous month
-                if day > 22:
-                    m = self._date.month - 1
-                    y = self._date.year
-                    if m == -1:
-                        m = 12
-                        y -= 1
-                    try:
-                        ev_date = self.date(y, m, day)
-                        if (end is None or ev_date <= end) and (ev_date >= start):
-                            self._show_event(ev_date, desc, cat)
-                    except ValueError:
-                        pass  # month has no day 'day'
-                # current month
-                try:
-                    ev_date = self.date(self._date.year, self._date.month, day)
-                    if (end is None or ev_date <= end) and (ev_date >= start):
-                        self._show_event(ev_date, desc, cat)
-                except ValueError:
-                    pass  # month has no day 'day'
-                # next month
-                if day < 15:
-                    try:
-                        m = self._date.month + 1
-                        y = self._date.year
-                        if m == 13:
-                            m = 1
-                            y += 1
-                        ev_date = self.date(y, m, day)
-                        if (end is None or ev_date <= end) and (ev_date >= start):
-                            self._show_event(ev_date, desc, cat)
-                    except ValueError:
-                        pass  # month has no day 'day'
-
-            elif freq == 'week':
-                cal = self._get_cal(self._date.year, self._date.month)
-                if start < cal[0][0]:
-                    w_min = 0
-                    d_min = 0
-                elif start > cal[-1][-1]:
-                    w_min = 6
-                    d_min = 7
-                else:
-                    _, w_min, d_min = start.isocalendar()
-                    w_min -= self._date.isocalendar()[1]
-                    w_min %= 52
-                    d_min -= 1
-
-                if end is None or end > cal[-1][-1]:
-                    w_max = 6
-                    d_max = 7
-                elif end < cal[0][0]:
-                    w_max = 0
-                    d_max = 0
-                else:
-                    _, w_max, d_max = end.isocalendar()
-                    w_max -= self._date.isocalendar()[1]
-                    w_max %= 52
-                for d in repeat['WeekDays']:
-                    self._weekly_events[d].append((desc, iid, start, end, cat))
-                    for w in range(w_min + 1, w_max):
-                        self._add_to_tooltip(w, d, desc, cat)
-                if w_min < w_max:
-                    for d in repeat['WeekDays']:
-                        if d >= d_min:
-                            self._add_to_tooltip(w_min, d, desc, cat)
-                if w_max < 6:
-                    for d in repeat['WeekDays']:
-                        if d < d_max:
-                            self._add_to_tooltip(w_max, d, desc, cat)
-        self._display_selection()
-
-    def _remove_event(self, date, desc, iid, repeat, cat):
-        year, month, day = date.year, date.month, date.day
-        try:
-            if not repeat:
-                date2 = date.strftime('%Y/%m/%d')
-                self._events[date2].remove((desc, iid, cat))
-                if not self._events[date2]:
-                    del(self._events[date2])
-                self._remove_from_tooltip(date, desc)
-            else:
-                start = date.date()
-                freq = repeat['Frequency']
-                if repeat['Limit'] == 'until':
-                    end = repeat['EndDate']
-                elif repeat['Limit'] == 'after':
-                    nb = repeat['NbTimes'] - 1  # date is the first time
-                    if freq == 'year':
-                        end = date.replace(year=date.year + nb)
-                    elif freq == 'month':
-                        m = date.month + nb
-                        month = m % 12
-                        year = date.year + m // 12
-                        end = date.replace(year=year, month=month)
-                    else:
-                        start_day = date.isocalendar()[2] - 1
-                        week_days = [(x - start_day) % 7 for x in repeat['WeekDays']]
-
-                        nb_per_week = len(repeat['WeekDays'])
-                        nb_week = nb // nb_per_week
-                        rem = nb % nb_per_week
-                        end = date + self.timedelta(days=(7 * nb_week + week_days[rem] + 1))
-                    end = end.date()
-                else:
-                    end = None
-                if freq == 'year':
-                    date2 = date.strftime('*/%m/%d')
-                    self._events[date2].remove((desc, iid, start, end, cat))
-                    if not self._events[date2]:
-                        del(self._events[date2])
-                    ev_date = self.date(self._date.year, month, day)
-                    if (end is None or ev_date <= end) and (ev_date >= start):
-                        self._remove_from_tooltip(ev_date, desc)
-
-                elif freq == 'month':
-                    date2 = date.strftime('*/*/%d')
-                    self._events[date2].remove((desc, iid, start, end, cat))
-                    if not self._events[date2]:
-                        del(self._events[date2])
-                    # previous month
-                    if day > 22:
-                        m = self._date.month - 1
-                        y = self._date.year
-                        if m == -1:
-                            m = 12
-                            y -= 1
-                        try:
-                            ev_date = self.date(y, m, day)
-                            if (end is None or ev_date <= end) and (ev_date >= start):
-                                self._remove_from_tooltip(ev_date, desc)
-                        except ValueError:
-                            pass  # month has no day 'day'
-                    # current month
-                    try:
-                        ev_date = self.date(self._date.year, self._date.month, day)
-                        if (end is None or ev_date <= end) and (ev_date >= start):
-                            self._remove_from_tooltip(ev_date, desc)
-                    except ValueError:
-                        pass  # month has no day 'day'
-                    # next month
-                    if day < 15:
-                        try:
-                            m = self._date.month + 1
-                            y = self._date.year
-                            if m == 13:
-                                m = 1
-                                y += 1
-                            ev_date = self.date(y, m, day)
-                            if (end is None or ev_date <= end) and (ev_date >= start):
-                                self._remove_from_tooltip(ev_date, desc)
-                        except ValueError:
-                            pass  # month has no day 'day'
-
-                elif freq == 'week':
-                    cal = self._get_cal(self._date.year, self._date.month)
-                    for d in repeat['WeekDays']:
-                        self._weekly_events[d].remove((desc, iid, start, end, cat))
-                        for w in range(6):
-                            self._remove_from_tooltip(cal[w][d], desc)
-
-        except ValueError:
-            raise ValueError('Event not in calendar.')
+            return '➢ %s' % event['Summary']
 
     def _get_date(self, week_row, day):
         year, month = self._date.year, self._date.month
@@ -498,31 +230,7 @@ class EventCalendar(Calendar):
         self.menu.delete(0, 'end')
         day = int(event.widget.cget('text'))
         date = self._get_date(w, day)
-        date2 = date.date()
-
-        # --- one time events
-        date_str = date.strftime('%Y/%m/%d')
-        if date_str in self._events:
-            evts = self._events[date_str].copy()
-        else:
-            evts = []
-        # --- yearly events
-        date_str = date.strftime('*/%m/%d')
-        if date_str in self._events:
-            for desc, iid, start, end, cat in self._events[date_str]:
-                if start <= date2 and (end is None or end >= date2):
-                    evts.append((desc, iid))
-        # --- monthly events
-        date_str = date.strftime('*/*/%d')
-        if date_str in self._events:
-            for desc, iid, start, end, cat in self._events[date_str]:
-                if start <= date2 and (end is None or end >= date2):
-                    evts.append((desc, iid))
-        d = date.isocalendar()[2] - 1
-        # --- weekly events
-        for desc, iid, start, end, cat in self._weekly_events[d]:
-            if start <= date2 and (end is None or end >= date2):
-                evts.append((desc, iid))
+        evts = self.get_events(date)
 
         self.menu.add_command(label=_('New Event'),
                               command=lambda: self.master.master.add(date))
@@ -530,8 +238,8 @@ class EventCalendar(Calendar):
             self.menu.add_separator()
             self.menu.add_separator()
             index_edit = 2
-            for vals in evts:
-                desc, iid = vals[0], vals[1]
+            for iid in evts:
+                desc = self._get_desc(self._index.events[iid])
                 self.menu.insert_command(index_edit,
                                          label=_("Edit") + " %s" % desc,
                                          command=lambda i=iid: self.master.master.edit(i))
@@ -552,20 +260,7 @@ class EventCalendar(Calendar):
     # --- public methods
     def get_events(self, date):
         """ Return the iid of all events occuring on date. """
-        evts = []
-        for desc, iid, cat in self._events.get(date.strftime('%Y/%m/%d'), []):
-            evts.append(iid)
-        for desc, iid, start, end, cat in self._events.get(date.strftime('*/%m/%d'), []):
-            if start <= date and (end is None or end >= date):
-                evts.append(iid)
-        for desc, iid, start, end, cat in self._events.get(date.strftime('*/*/%d'), []):
-            if start <= date and (end is None or end >= date):
-                evts.append(iid)
-        y, w, d = date.isocalendar()
-        for desc, iid, start, end, cat in self._weekly_events[d - 1]:
-            if start <= date and (end is None or end >= date):
-                evts.append(iid)
-        return evts
+        return self._index.get_events(date)
 
     def add_holiday(self, date):
         year = date.year
@@ -607,35 +302,22 @@ class EventCalendar(Calendar):
         except ValueError:
             raise ValueError('%s is not a holiday.' % format_date(date, locale=self["locale"]))
 
+    def update_events(self):
+        """Redraw the events after changes in the index."""
+        self._display_calendar()
+
     def add_event(self, event):
-        start = event['Start']
-        end = event['End']
-        if not event["WholeDay"]:
-            deb = format_time(start, locale=self["locale"])
-            fin = format_time(end, locale=self["locale"])
-            desc = '➢ %s - %s %s' % (deb, fin, event['Summary'])
-        else:
-            desc = '➢ %s' % event['Summary']
-        repeat = event['Repeat']
-        dt = end - start
-        for d in range(dt.days + 1):
-            self._add_event(start + self.timedelta(days=d),
-                            desc, event.iid, repeat, event['Category'])
+        """Add event to the calendar (or update it if already displayed)."""
+        self._index.add(event)
+        self._display_calendar()
 
     def remove_event(self, event):
-        start = event['Start']
-        end = event['End']
-        if not event["WholeDay"]:
-            deb = format_time(start, locale=self["locale"])
-            fin = format_time(end, locale=self["locale"])
-            desc = '➢ %s - %s %s' % (deb, fin, event['Summary'])
-        else:
-            desc = '➢ %s' % event['Summary']
-        repeat = event['Repeat']
-        dt = end - start
-        for d in range(dt.days + 1):
-            self._remove_event(start + self.timedelta(days=d),
-                               desc, event.iid, repeat, event['Category'])
+        """Remove event from the calendar."""
+        try:
+            self._index.remove(event.iid)
+        except KeyError:
+            raise ValueError('Event not in calendar.')
+        self._display_calendar()
 
     def bind(self, *args):
         Calendar.bind(self, *args)
@@ -0,0 +1,234 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Filtering of the events in the manager
+"""
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+
+class _SortedIndex:
+    """Events sorted by a datetime key."""
+    def __init__(self):
+        self.keys = []
+        self.iids = []
+
+    def add(self, key, iid):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.iids.insert(i, iid)
+
+    def remove(self, key, iid):
+        i = bisect_left(self.keys, key)
+        j = bisect_right(self.keys, key)
+        i += self.iids[i:j].index(iid)
+        del self.keys[i]
+        del self.iids[i]
+
+    def until(self, key):
+        """Return the iids of the events whose key is <= key."""
+        return self.iids[:bisect_right(self.keys, key)]
+
+    def since(self, key):
+        """Return the iids of the events whose key is >= key."""
+        return self.iids[bisect_left(self.keys, key):]
+
+
+class TextIndex:
+    """
+    Incremental inverted index of the words of the events.
+
+    Each word maps to the set of the events containing it in their Summary,
+    Place or Description and the sorted list of the words allows prefix
+    searches by bisection.
+    """
+    fields = ('Summary', 'Place', 'Description')
+    _split = re.compile(r'\w+').findall
+
+    def __init__(self):
+        self._index = {}        # word: set of iids
+        self._words = []        # sorted words
+        self._event_words = {}  # iid: words of the event
+
+    def tokenize(self, text):
+        """Return the set of the (casefolded) words of text."""
+        return set(self._split(text.casefold()))
+
+    def add(self, event):
+        """Index the words of event (replacing the previous entry if any)."""
+        iid = event.iid
+        if iid in self._event_words:
+            self.remove(iid)
+        words = set()
+        for field in self.fields:
+            words.update(self.tokenize(event[field]))
+        self._event_words[iid] = words
+        for word in words:
+            iids = self._index.get(word)
+            if iids is None:
+                self._index[word] = {iid}
+                insort(self._words, word)
+            else:
+                iids.add(iid)
+
+    def remove(self, iid):
+        """Remove event iid from the index."""
+        for word in self._event_words.pop(iid):
+            iids = self._index[word]
+            iids.discard(iid)
+            if not iids:
+                del self._index[word]
+                del self._words[bisect_left(self._words, word)]
+
+    def search(self, text):
+        """
+        Return the set of the events containing, for each word of text, a word
+        starting with it.
+
+        Return None if text contains no word.
+        """
+        res = None
+        words = self._words
+        # longer words are more selective
+        for prefix in sorted(self.tokenize(text), key=len, reverse=True):
+            matches = set()
+            i = bisect_left(words, prefix)
+            while i < len(words) and words[i].startswith(prefix):
+                matches.update(self._index[words[i]])
+                i += 1
+            res = matches if res is None else res & matches
+            if not res:
+                break
+        return res
+
+
+class EventFilter:
+    """
+    Indexes of the events used to filter the manager's list.
+
+    Inverted indexes map each category, place and task state to the set of
+    events having it. The events are also sorted by start and by end (end of
+    the last occurrence for repeated events) so that the events overlapping
+    a period are obtained by bisection (the repeated events found this way
+    are then checked for an occurrence in the period). The text search uses
+    a TextIndex.
+    """
+    fields = ('Category', 'Place', 'Task')
+
+    def __init__(self):
+        self._inverted = {field: {} for field in self.fields}
+        self._starts = _SortedIndex()
+        self._ends = _SortedIndex()
+        self._text = TextIndex()
+        self._keys = {}  # iid: (field values, start, end)
+        self._repeated = {}  # iid: event, for the repeated events
+
+    @staticmethod
+    def _get_keys(event):
+        task = event['Task']
+        if task and '%' in task:
+            task = 'In Progress'
+        start = event['Start']
+        last = event.get_last_date()
+        if last is None:
+            end = datetime.max
+        else:
+            end = event['End'] + (last - start.date())
+        return (event['Category'], event['Place'], task), start, end
+
+    def add(self, event):
+        """Add event to the indexes (replacing the previous entry if any)."""
+        iid = event.iid
+        if iid in self._keys:
+            self.remove(iid)
+        values, start, end = keys = self._get_keys(event)
+        self._keys[iid] = keys
+        if event['Repeat']:
+            self._repeated[iid] = event
+        for field, value in zip(self.fields, values):
+            self._inverted[field].setdefault(value, set()).add(iid)
+        self._starts.add(start, iid)
+        self._ends.add(end, iid)
+        self._text.add(event)
+
+    def remove(self, iid):
+        """Remove event iid from the indexes."""
+        values, start, end = self._keys.pop(iid)
+        self._repeated.pop(iid, None)
+        for field, value in zip(self.fields, values):
+            iids = self._inverted[field][value]
+            iids.discard(iid)
+            if not iids:
+                del self._inverted[field][value]
+        self._starts.remove(start, iid)
+        self._ends.remove(end, iid)
+        self._text.remove(iid)
+
+    @staticmethod
+    def _occurs(event, after, before):
+        """Return whether an occurrence of the repeated event overlaps [after, before]."""
+        start = event['Start']
+        duration = event['End'] - start
+        for day in event.get_occurrences(None if after is None else after - duration, before):
+            occurrence = datetime.combine(day, start.time())
+            if before is not None and occurrence > before:
+                return False
+            if after is None or occurrence + duration >= after:
+                return True
+        return False
+
+    def values(self, field):
+        """Return the sorted list of the existing values of field."""
+        return sorted(value for value in self._inverted[field] if value)
+
+    def filter(self, criteria=None, after=None, before=None, text=''):
+        """
+        Return the set of the iids of the events matching all the criteria.
+
+        criteria: {field: value} dictionary, fields being in EventFilter.fields
+        after, before: datetimes, the events have to overlap this period
+        text: words (or beginning of words) contained in the Summary, Place
+              or Description of the events
+        """
+        sets = []
+        if criteria:
+            for field, value in criteria.items():
+                sets.append(self._inverted[field].get(value, set()))
+        if after is not None:
+            sets.append(self._ends.since(after))
+        if before is not None:
+            sets.append(self._starts.until(before))
+        if text:
+            matches = self._text.search(text)
+            if matches is not None:
+                sets.append(matches)
+        if not sets:
+            res = set(self._keys)
+        else:
+            sets.sort(key=len)
+            res = set(sets[0])
+            for s in sets[1:]:
+                res.intersection_update(s)
+        if after is not None or before is not None:
+            # the repetition overlaps the period, but not necessarily an occurrence
+            res = {iid for iid in res if iid not in self._repeated
+                   or self._occurs(self._repeated[iid], after, before)}
+        return res
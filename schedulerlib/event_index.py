@@ -0,0 +1,266 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Occurrence index of the events
+"""
+from datetime import date
+from random import random
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'iid', 'prio', 'max_end', 'left', 'right')
+
+    def __init__(self, start, end, iid):
+        self.start = start
+        self.end = end
+        self.iid = iid
+        self.prio = random()
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+    def key(self):
+        return self.start, self.end, self.iid
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+class IntervalTree:
+    """
+    Set of closed intervals [start, end] with an identifier.
+
+    It is a treap sorted by interval start and augmented with the maximum
+    end of each subtree, so that insertion and removal are in O(log n) and
+    the search of the intervals overlapping [a, b] is in O(log n + k).
+    """
+    def __init__(self):
+        self._root = None
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    @staticmethod
+    def _rotate_right(node):
+        left = node.left
+        node.left = left.right
+        left.right = node
+        node.update()
+        left.update()
+        return left
+
+    @staticmethod
+    def _rotate_left(node):
+        right = node.right
+        node.right = right.left
+        right.left = node
+        node.update()
+        right.update()
+        return right
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.key() < node.key():
+            node.left = self._insert(node.left, new)
+            if node.left.prio > node.prio:
+                return self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.prio > node.prio:
+                return self._rotate_left(node)
+        node.update()
+        return node
+
+    def _merge(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.prio > right.prio:
+            left.right = self._merge(left.right, right)
+            left.update()
+            return left
+        else:
+            right.left = self._merge(left, right.left)
+            right.update()
+            return right
+
+    def _remove(self, node, key):
+        if node is None:
+            raise KeyError(key)
+        node_key = node.key()
+        if key == node_key:
+            return self._merge(node.left, node.right)
+        if key < node_key:
+            node.left = self._remove(node.left, key)
+        else:
+            node.right = self._remove(node.right, key)
+        node.update()
+        return node
+
+    def insert(self, start, end, iid):
+        self._root = self._insert(self._root, _Node(start, end, iid))
+        self._len += 1
+
+    def remove(self, start, end, iid):
+        self._root = self._remove(self._root, (start, end, iid))
+        self._len -= 1
+
+    def search(self, a, b):
+        """Return the list of (start, end, iid) overlapping [a, b]."""
+        res = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < a:
+                continue
+            if node.start <= b:
+                if node.end >= a:
+                    res.append((node.start, node.end, node.iid))
+                stack.append(node.right)
+            stack.append(node.left)
+        return res
+
+
+class EventIndex:
+    """
+    Index of the occurrences of the events.
+
+    One-time events (possibly spanning several days) are stored in an
+    interval tree. Repeated events are stored in per-rule buckets: by
+    (month, day) for yearly events, by day of the month for monthly events
+    and by weekday for weekly ones, each entry having the first and last
+    day of the repetition and the number of days the occurrences last after
+    their first day.
+
+    Since the length of the months varies, the yearly and monthly events
+    are only indexed by the first day of their occurrences, the following
+    days being added when querying. The weekly events are indexed by each
+    day of their occurrences.
+    """
+    def __init__(self):
+        self._tree = IntervalTree()
+        self._yearly = {}   # (month, day): {iid: [(first, last, span), ...]}
+        self._monthly = {}  # day: {iid: [(first, last, span), ...]}
+        self._weekly = {}   # weekday: {iid: [(first, last, 0), ...]}
+        self._max_span = 0  # max span of the yearly and monthly events (never decreased)
+        self._entries = {}  # iid: interval or list of (rule, key)
+        self.events = {}
+        self.tasks = set()  # iids of the events that are tasks
+
+    def __contains__(self, iid):
+        return iid in self.events
+
+    def add(self, event):
+        """Add event to the index (replacing the previous entry if any)."""
+        iid = event.iid
+        if iid in self.events:
+            self.remove(iid)
+        self.events[iid] = event
+        if event['Task']:
+            self.tasks.add(iid)
+        start = event['Start'].toordinal()
+        end = start + max((event['End'] - event['Start']).days, 0)
+        repeat = event['Repeat']
+        if not repeat:
+            self._tree.insert(start, end, iid)
+            self._entries[iid] = (start, end, iid)
+            return
+        last = event.get_last_date()
+        if last is not None:
+            last = last.toordinal()
+        freq = repeat['Frequency']
+        span = end - start
+        day = event['Start'].date()
+        if freq == 'year':
+            keys = [(self._yearly, (day.month, day.day), (start, last, span))]
+        elif freq == 'month':
+            keys = [(self._monthly, day.day, (start, last, span))]
+        else:
+            # multi-day events: each day of the event is repeated
+            keys = [(self._weekly, (wd + d) % 7, (start + d, None if last is None else last + d, 0))
+                    for d in range(span + 1) for wd in repeat['WeekDays']]
+        if freq != 'week':
+            self._max_span = max(self._max_span, span)
+        entries = []
+        for rule, key, bounds in keys:
+            rule.setdefault(key, {}).setdefault(iid, []).append(bounds)
+            entries.append((rule, key))
+        self._entries[iid] = entries
+
+    def remove(self, iid):
+        """Remove event iid from the index."""
+        del self.events[iid]
+        self.tasks.discard(iid)
+        entries = self._entries.pop(iid)
+        if isinstance(entries, tuple):
+            self._tree.remove(*entries)
+            return
+        for rule, key in entries:
+            bucket = rule.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(iid, None)
+            if not bucket:
+                del rule[key]
+
+    @staticmethod
+    def _match(bucket, day):
+        """Yield (iid, span) for the events of bucket having an occurrence starting on day."""
+        for iid, bounds in bucket.items():
+            for first, last, span in bounds:
+                if first <= day and (last is None or day <= last):
+                    yield iid, span
+                    break
+
+    def get_events(self, day):
+        """Return the iids of the events occurring on day."""
+        day = date.fromordinal(day.toordinal())
+        return self.get_events_between(day, day).get(day, [])
+
+    def get_events_between(self, start, end):
+        """Return {date: [iid, ...]} for the days in [start, end] with events."""
+        first, last = start.toordinal(), end.toordinal()
+        occurrences = {}
+        for s, e, iid in self._tree.search(first, last):
+            for o in range(max(s, first), min(e, last) + 1):
+                occurrences.setdefault(o, []).append(iid)
+        yearly, monthly, weekly = self._yearly, self._monthly, self._weekly
+        # the occurrences starting before first can last until first
+        for o in range(max(first - self._max_span, 1), last + 1):
+            day = date.fromordinal(o)
+            for bucket in (yearly.get((day.month, day.day)), monthly.get(day.day)):
+                if bucket:
+                    for iid, span in self._match(bucket, o):
+                        for p in range(max(o, first), min(o + span, last) + 1):
+                            occurrences.setdefault(p, []).append(iid)
+            if o >= first:
+                bucket = weekly.get(day.weekday())
+                if bucket:
+                    for iid, span in self._match(bucket, o):
+                        occurrences.setdefault(o, []).append(iid)
+        return {date.fromordinal(o): iids for o, iids in occurrences.items()}
@@ -0,0 +1,126 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Event database
+"""
+import os
+import shutil
+import logging
+import sqlite3
+import pickle
+
+from schedulerlib.constants import DB_PATH, DB_BACKUP_PATH, DATA_PATH, BACKUP_PATH
+
+
+class EventStore:
+    """
+    SQLite event database.
+
+    Each event is stored in its own row (pickled properties) so that adding,
+    editing or deleting an event only writes the corresponding row.
+    """
+    version = 1  # database format, stored in PRAGMA user_version
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        try:
+            self._db = self._connect()
+        except sqlite3.DatabaseError:
+            logging.exception('Corrupted event database')
+            self._restore_backup()
+            self._db = self._connect()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        db.execute('CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, data BLOB)')
+        if db.execute('PRAGMA user_version').fetchone()[0] < self.version:
+            self._migrate(db)
+        return db
+
+    def _restore_backup(self):
+        """Replace the database by the most recent backup."""
+        folder = os.path.dirname(DB_BACKUP_PATH)
+        backups = [f for f in os.listdir(folder) if f.startswith('events.backup')]
+        if not backups:
+            os.remove(self.path)
+            return
+        backups.sort(key=lambda x: int(x[13:]))
+        shutil.copy(os.path.join(folder, backups[-1]), self.path)
+
+    @staticmethod
+    def _load_pickle():
+        """Return the content of the legacy pickle database (or its last backup)."""
+        try:
+            with open(DATA_PATH, 'rb') as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return []
+        except Exception:
+            folder = os.path.dirname(BACKUP_PATH)
+            backups = [f for f in os.listdir(folder) if f.startswith('data.backup')]
+            if not backups:
+                return []
+            backups.sort(key=lambda x: int(x[11:]))
+            with open(os.path.join(folder, backups[-1]), 'rb') as file:
+                return pickle.load(file)
+
+    def _migrate(self, db):
+        """One-time import of the legacy pickle database."""
+        data = self._load_pickle()
+        with db:
+            db.executemany('INSERT OR REPLACE INTO events (id, data) VALUES (?, ?)',
+                           ((i, pickle.dumps(prop)) for i, prop in enumerate(data)))
+            db.execute('PRAGMA user_version = %i' % self.version)
+        if data:
+            logging.info('Imported %i events from %s', len(data), DATA_PATH)
+        # do not import it again if the database has to be recreated
+        if os.path.exists(DATA_PATH):
+            os.replace(DATA_PATH, DATA_PATH + '.migrated')
+
+    def load(self):
+        """Return the list of (iid, properties) of the stored events."""
+        cursor = self._db.execute('SELECT id, data FROM events ORDER BY id')
+        return [(str(iid), pickle.loads(data)) for iid, data in cursor]
+
+    def save(self, iid, prop):
+        """Write the properties of event iid."""
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO events (id, data) VALUES (?, ?)',
+                             (int(iid), pickle.dumps(prop)))
+
+    def save_many(self, events):
+        """Write the properties of several events in a single transaction."""
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO events (id, data) VALUES (?, ?)',
+                                 ((int(iid), pickle.dumps(prop)) for iid, prop in events))
+
+    def delete(self, iid):
+        """Remove event iid from the database."""
+        with self._db:
+            self._db.execute('DELETE FROM events WHERE id=?', (int(iid),))
+
+    def delete_many(self, iids):
+        """Remove several events in a single transaction."""
+        with self._db:
+            self._db.executemany('DELETE FROM events WHERE id=?',
+                                 ((int(iid),) for iid in iids))
+
+    def close(self):
+        self._db.close()
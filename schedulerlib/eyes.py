@@ -24,29 +24,33 @@ from subprocess import Popen
 
 from .constants import IM_EYE, IM_START_M, IM_STOP_M, CONFIG
 from .trayicon import SubMenu
+from .clock import Stopwatch
 
 
 class Eyes(SubMenu):
     def __init__(self, parent, tkwindow):
         SubMenu.__init__(self, parent=parent)
-        self.time = [0, 0]
+        self.stopwatch = Stopwatch()  # time since last rest
         self.is_on = False
         self.tkwindow = tkwindow
-        self._after_id = None
+        self._timer = None
 
         self.add_command(label=_('Start'), command=self.start_stop, image=IM_START_M)
         self.add_command(label=_('Status'), command=self.status)
 
     def quit(self):
-        try:
-            self.tkwindow.after_cancel(self._after_id)
-        except ValueError:
-            pass
+        self.tkwindow.dispatcher.cancel(self._timer)
+        self._timer = None
+
+    def _schedule(self):
+        interval = CONFIG.getint("General", "eyes_interval", fallback=20) * 60
+        self._timer = self.tkwindow.dispatcher.call_later(interval, self.timer)
 
     def start_stop(self):
         if self.is_on:
             self.is_on = False
-            self.time = [0, 0]
+            self.quit()
+            self.stopwatch.reset()
             self.set_item_image(0, _('Start'))
             self.set_item_image(0, IM_START_M)
         else:
@@ -55,25 +59,22 @@ class Eyes(SubMenu):
                    _("The eyes' rest script has been launched!")])
             self.set_item_label(0, _('Stop'))
             self.set_item_image(0, IM_STOP_M)
-            self._after_id = self.tkwindow.after(1000, self.timer)
+            self.stopwatch.start()
+            self._schedule()
 
     def timer(self):
         if self.is_on:
-            self.time[1] += 1
-            if self.time[1] == 60:
-                self.time[1] = 0
-                self.time[0] += 1
-                if self.time[0] == CONFIG.getint("General", "eyes_interval", fallback=20):
-                    Popen(["notify-send", "-i", IM_EYE, _("Eyes' rest"),
-                           _("Look away from your screen for 20 s")])
-                    self.time[0] = 0
-
-            self._after_id = self.tkwindow.after(1000, self.timer)
+            Popen(["notify-send", "-i", IM_EYE, _("Eyes' rest"),
+                   _("Look away from your screen for 20 s")])
+            self.stopwatch.reset()
+            self.stopwatch.start()
+            self._schedule()
 
     def status(self):
         if self.is_on:
+            minutes, seconds = divmod(int(self.stopwatch.elapsed()), 60)
             Popen(["notify-send", "-i", IM_EYE, "Scheduler",
-                   _("Time since last eyes' rest: {min} min {sec} s").format(min=self.time[0], sec=self.time[1])])
+                   _("Time since last eyes' rest: {min} min {sec} s").format(min=minutes, sec=seconds)])
         else:
             Popen(["notify-send", "-i", IM_EYE, "Scheduler",
                    _("The eyes' rest script is not active.")])
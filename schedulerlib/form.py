@@ -489,12 +489,13 @@ class Form(Toplevel):
                       'WeekDays': days}
             self.event['Repeat'] = repeat
 
-        self.event.reminder_remove_all()
+        dates = []
         for when, what in self.alarms:
             dt = int(when.get())
             unit = FREQ_REV_TRANSLATION[what.get()]
-            date = self.event['Start'] - timedelta(**{unit: dt})
-            self.event.reminder_add(date)
+            dates.append(self.event['Start'] - timedelta(**{unit: dt}))
+        with self.master.jobstore.batch():
+            self.event.set_reminders(dates)
 
         if self._new:
             self.master.event_add(self.event)
@@ -503,6 +504,4 @@ class Form(Toplevel):
         self.destroy()
 
     def cancel(self):
-        if not self._new:
-            self.master.widgets['Calendar'].add_event(self.event)
         self.destroy()
@@ -0,0 +1,278 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Job store of the reminders
+"""
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import BaseJobStore, JobLookupError, ConflictingIdError
+from apscheduler.util import datetime_to_utc_timestamp, utc_timestamp_to_datetime
+
+
+def _sort_key(row):
+    # same order as ORDER BY next_run_time: paused jobs (NULL) first
+    return (row[1] is not None, row[1] or 0)
+
+
+class SQLiteJobStore(BaseJobStore):
+    """
+    APScheduler job store on sqlite3.
+
+    The jobs are stored in the table
+
+        jobs (id, next_run_time, job_state)
+
+    with an index on next_run_time. The job state is pickled without the
+    job id, which is the key of the table. The jobs of the SQLAlchemy job
+    store used by the previous versions are imported when the store starts.
+
+    By default, each job modification is committed separately. Inside a
+    batch() block, the modifications made by the thread are kept in memory
+    (and taken into account by its queries) and written in a single
+    transaction at the end of the block (even if it raised an exception), so
+    that no database lock is held while the block calls the scheduler.
+
+    A connection is opened per thread, in WAL mode so that the scheduler's
+    thread is not blocked by the readers.
+    """
+    legacy_table = 'apscheduler_jobs'  # table of the SQLAlchemy job store
+
+    def __init__(self, path, pickle_protocol=pickle.HIGHEST_PROTOCOL):
+        BaseJobStore.__init__(self)
+        self.path = path
+        self.pickle_protocol = pickle_protocol
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        """Connection of the current thread."""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path)
+            db.execute('PRAGMA journal_mode=WAL')
+            self._local.db = db
+        return db
+
+    @property
+    def _pending(self):
+        """Modifications of the current batch {job_id: row or None if removed}."""
+        return getattr(self._local, 'pending', None)
+
+    def start(self, scheduler, alias):
+        BaseJobStore.start(self, scheduler, alias)
+        with self.db:
+            self.db.execute('''CREATE TABLE IF NOT EXISTS jobs
+                                (id TEXT PRIMARY KEY,
+                                 next_run_time REAL,
+                                 job_state BLOB NOT NULL)''')
+            self.db.execute('CREATE INDEX IF NOT EXISTS jobs_next_run_time ON jobs(next_run_time)')
+            self._migrate()
+
+    def _migrate(self):
+        """Import the jobs of the SQLAlchemy job store."""
+        if not self.db.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+                                (self.legacy_table,)).fetchone():
+            return
+        rows = []
+        for job_id, next_run_time, job_state in self.db.execute(
+                'SELECT id, next_run_time, job_state FROM %s' % self.legacy_table):
+            try:
+                state = pickle.loads(job_state)
+            except Exception:
+                self._logger.exception('Unable to import job "%s", removing it', job_id)
+                continue
+            rows.append((job_id, next_run_time, self._dumps(state)))
+        self.db.executemany('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?)', rows)
+        self.db.execute('DROP TABLE %s' % self.legacy_table)
+        self._logger.info('Imported %i jobs', len(rows))
+
+    def _dumps(self, state):
+        state = dict(state)
+        del state['id']
+        return pickle.dumps(state, self.pickle_protocol)
+
+    def _reconstitute_job(self, job_id, job_state):
+        state = pickle.loads(job_state)
+        state['id'] = job_id
+        state['jobstore'] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _row(self, job):
+        return (job.id, datetime_to_utc_timestamp(job.next_run_time),
+                self._dumps(job.__getstate__()))
+
+    def _rows(self, due=None):
+        """Return the sorted (id, next_run_time, job_state) rows, due before due if not None."""
+        query = 'SELECT id, next_run_time, job_state FROM jobs'
+        if due is None:
+            rows = self.db.execute(query + ' ORDER BY next_run_time').fetchall()
+        else:
+            rows = self.db.execute(query + ' WHERE next_run_time <= ? ORDER BY next_run_time',
+                                   (due,)).fetchall()
+        pending = self._pending
+        if pending:
+            rows = [row for row in rows if row[0] not in pending]
+            rows.extend(row for row in pending.values()
+                        if row is not None and (due is None or (row[1] is not None and row[1] <= due)))
+            rows.sort(key=_sort_key)
+        return rows
+
+    def _exists(self, job_id):
+        pending = self._pending
+        if pending and job_id in pending:
+            return pending[job_id] is not None
+        return self.db.execute('SELECT 1 FROM jobs WHERE id=?', (job_id,)).fetchone() is not None
+
+    def _get_jobs(self, due=None):
+        jobs = []
+        failed = []
+        for job_id, next_run_time, job_state in self._rows(due):
+            try:
+                jobs.append(self._reconstitute_job(job_id, job_state))
+            except Exception:
+                self._logger.exception('Unable to restore job "%s" -- removing it', job_id)
+                failed.append(job_id)
+        if failed:
+            self.remove_jobs(failed)
+        return jobs
+
+    @contextmanager
+    def batch(self):
+        """Write all the job modifications of the block in a single transaction."""
+        if self._pending is not None:  # nested batch
+            yield
+            return
+        self._local.pending = pending = {}
+        try:
+            yield
+        finally:
+            # written even if the block failed: the modifications made so far
+            # are already known to the callers (e.g. in the events' reminders)
+            self._local.pending = None
+            self._write(pending)
+
+    def _write(self, pending):
+        with self.db as db:
+            db.executemany('DELETE FROM jobs WHERE id=?',
+                           [(job_id,) for job_id, row in pending.items() if row is None])
+            db.executemany('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?)',
+                           [row for row in pending.values() if row is not None])
+        if pending:
+            # the scheduler did not see the new jobs when they were added
+            self._scheduler.wakeup()
+
+    def lookup_job(self, job_id):
+        pending = self._pending
+        if pending and job_id in pending:
+            row = pending[job_id]
+            return None if row is None else self._reconstitute_job(job_id, row[2])
+        row = self.db.execute('SELECT job_state FROM jobs WHERE id=?', (job_id,)).fetchone()
+        return None if row is None else self._reconstitute_job(job_id, row[0])
+
+    def get_due_jobs(self, now):
+        return self._get_jobs(datetime_to_utc_timestamp(now))
+
+    def get_next_run_time(self):
+        if self._pending:
+            times = [row[1] for row in self._rows() if row[1] is not None]
+            return utc_timestamp_to_datetime(times[0]) if times else None
+        row = self.db.execute('''SELECT next_run_time FROM jobs
+                                  WHERE next_run_time IS NOT NULL
+                                  ORDER BY next_run_time LIMIT 1''').fetchone()
+        return None if row is None else utc_timestamp_to_datetime(row[0])
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        pending = self._pending
+        if pending is not None:
+            if self._exists(job.id):
+                raise ConflictingIdError(job.id)
+            pending[job.id] = self._row(job)
+            return
+        try:
+            with self.db as db:
+                db.execute('INSERT INTO jobs VALUES (?, ?, ?)', self._row(job))
+        except sqlite3.IntegrityError:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        pending = self._pending
+        if pending is not None:
+            if not self._exists(job.id):
+                raise JobLookupError(job.id)
+            pending[job.id] = self._row(job)
+            return
+        job_id, next_run_time, job_state = self._row(job)
+        with self.db as db:
+            cursor = db.execute('UPDATE jobs SET next_run_time=?, job_state=? WHERE id=?',
+                                (next_run_time, job_state, job_id))
+        if cursor.rowcount == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        pending = self._pending
+        if pending is not None:
+            if not self._exists(job_id):
+                raise JobLookupError(job_id)
+            pending[job_id] = None
+            return
+        with self.db as db:
+            cursor = db.execute('DELETE FROM jobs WHERE id=?', (job_id,))
+        if cursor.rowcount == 0:
+            raise JobLookupError(job_id)
+
+    def remove_jobs(self, job_ids):
+        """Remove the jobs job_ids in a single transaction, ignore the missing ones."""
+        pending = self._pending
+        if pending is not None:
+            pending.update((job_id, None) for job_id in job_ids)
+            return
+        with self.db as db:
+            db.executemany('DELETE FROM jobs WHERE id=?', ((job_id,) for job_id in job_ids))
+
+    def remove_all_jobs(self):
+        pending = self._pending
+        if pending is not None:
+            pending.update((job_id, None) for job_id, t, s in self._rows())
+            return
+        with self.db as db:
+            db.execute('DELETE FROM jobs')
+
+    def shutdown(self):
+        """Close the connection of the current thread."""
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def __repr__(self):
+        return '<%s (path=%s)>' % (self.__class__.__name__, self.path)
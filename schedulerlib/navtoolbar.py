@@ -96,11 +96,19 @@ class NavigationToolbar(NavigationToolbar2Tk):
         if initialdir != "":
             rcParams['savefig.directory'] = (
                 os.path.dirname(str(fname)))
+        # animated artists are only drawn when blitting
+        animated = self.canvas.figure.findobj(lambda artist: artist.get_animated())
+        for artist in animated:
+            artist.set_animated(False)
         try:
             # This method will handle the delegation to the correct type
             self.canvas.figure.savefig(fname)
         except Exception as e:
             showerror(_("Error"), str(e))
+        finally:
+            for artist in animated:
+                artist.set_animated(True)
+            self.canvas.draw_idle()
 
     def _Button(self, text, file, command, **kwargs):
         im = PhotoImage(master=self, file=file)
@@ -0,0 +1,219 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Display of the reminders inside the application
+"""
+import os
+import logging
+from queue import Queue, Empty
+from subprocess import Popen
+from tkinter import Toplevel, Label, Button, READABLE
+
+from schedulerlib.constants import CONFIG, ICON_NOTIF, active_color
+
+
+_queue = Queue()   # texts of the reminders to display
+_notifier = None   # Notifier of the application
+
+
+def notify(text):
+    """
+    Display the reminder text.
+
+    Job function of the reminders, it can be called from any thread.
+    """
+    _queue.put(text)
+    if _notifier is not None:
+        _notifier.wake()
+
+
+class Notification(Toplevel):
+    """
+    Reminder window, displaying the texts one below the other.
+
+    The window blinks by changing the colors of its tk widgets: configuring
+    a ttk style would refresh all the ttk widgets of the application.
+    """
+    def __init__(self, master, texts=()):
+        Toplevel.__init__(self, master)
+        self.overrideredirect(True)
+        self.withdraw()
+        self.columnconfigure(0, weight=1)
+        self.attributes('-type', 'notification')
+        self.attributes('-alpha', 0.75)
+
+        self.bg = [CONFIG.get('Reminders', 'window_bg'),
+                   CONFIG.get('Reminders', 'window_bg_alternate')]
+        self.fg = [CONFIG.get('Reminders', 'window_fg'),
+                   CONFIG.get('Reminders', 'window_fg_alternate')]
+        self.active_bg = [active_color(*self.winfo_rgb(bg)) for bg in self.bg]
+        self.active_bg2 = [active_color(*self.winfo_rgb(bg)) for bg in self.active_bg]
+        self.configure(bg=self.bg[0])
+        self.texts = []
+        self.labels = []
+        self.button = Button(self, text='Ok', command=self.close, relief='flat',
+                             highlightthickness=0, bg=self.active_bg[0],
+                             activebackground=self.active_bg2[0], fg=self.fg[0],
+                             activeforeground=self.fg[0])
+        self.blink_alternate = False
+        self.alarm_id = ''
+        self.alarm_process = None
+        self.blink_id = ''
+        self.timeout_id = ''
+        self.add_texts(texts)
+        self.deiconify()
+        if CONFIG.getboolean('Reminders', 'blink'):
+            self.blink_id = self.after(500, self.blink)
+        if not CONFIG.getboolean("Reminders", "mute", fallback=False):
+            self.alarm()
+
+    def add_texts(self, texts):
+        """Display the new texts and restart the timeout."""
+        for text in texts:
+            if text not in self.texts:
+                i = self.blink_alternate
+                label = Label(self, text=text, bg=self.bg[i], fg=self.fg[i])
+                label.grid(row=len(self.texts), column=0, padx=10, pady=(10, 0))
+                self.labels.append(label)
+                self.texts.append(text)
+        self.button.grid(row=len(self.texts), column=0, padx=10, pady=10)
+        self.update_idletasks()
+        self.geometry('%ix%i+0+0' % (self.winfo_screenwidth(), self.winfo_reqheight()))
+        if self.timeout_id:
+            self.after_cancel(self.timeout_id)
+            self.timeout_id = ''
+        timeout = CONFIG.getint('Reminders', 'timeout') * 60 * 1000
+        if timeout > 0:
+            self.timeout_id = self.after(timeout, self.close)
+
+    def alarm(self):
+        self.alarm_process = Popen([CONFIG.get("General", "soundplayer"),
+                                    CONFIG.get("Reminders", "alarm")])
+        self.alarm_id = self.after(500, self.repeat_alarm)
+
+    def repeat_alarm(self):
+        if self.alarm_process.poll() is None:
+            self.alarm_id = self.after(500, self.repeat_alarm)
+        else:  # ringing is finished
+            self.alarm()
+
+    def close(self):
+        for after_id in (self.alarm_id, self.blink_id, self.timeout_id):
+            if after_id:
+                self.after_cancel(after_id)
+        if self.alarm_process is not None:
+            self.alarm_process.terminate()
+        self.destroy()
+
+    def blink(self):
+        self.blink_alternate = not self.blink_alternate
+        i = self.blink_alternate
+        self.configure(bg=self.bg[i])
+        for label in self.labels:
+            label.configure(bg=self.bg[i], fg=self.fg[i])
+        self.button.configure(bg=self.active_bg[i], activebackground=self.active_bg2[i],
+                              fg=self.fg[i], activeforeground=self.fg[i])
+        self.blink_id = self.after(500, self.blink)
+
+
+class Notifier:
+    """
+    Display the reminders sent with notify in the Tk thread.
+
+    The reminder jobs run in the threads of APScheduler: they put the text
+    in a queue and write to a pipe watched with createfilehandler to wake
+    up the Tk thread (the queue is polled every second by the dispatcher if
+    createfilehandler is not available).
+
+    The reminders received within delay seconds are gathered (and the
+    duplicates removed) in a single notification. They are displayed in the
+    same window, with a single alarm, as the ones not dismissed yet.
+    """
+    def __init__(self, master, dispatcher, delay=0.5):
+        global _notifier
+        self._master = master
+        self._dispatcher = dispatcher
+        self.delay = delay
+        self._timer = None
+        self._pending = []
+        self._flush_timer = None
+        self._window = None
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        try:
+            master.tk.createfilehandler(self._read_fd, READABLE, self._on_wake)
+        except AttributeError:
+            self._timer = dispatcher.call_every(1, self.process)
+        _notifier = self
+        self.wake()  # reminders sent before the creation of the notifier
+
+    def wake(self):
+        try:
+            os.write(self._write_fd, b'\0')
+        except BlockingIOError:
+            pass  # the pipe is full: already woken
+
+    def _on_wake(self, fd, mask):
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self.process()
+
+    def process(self):
+        """Gather the reminders received."""
+        while True:
+            try:
+                self._pending.append(_queue.get_nowait())
+            except Empty:
+                break
+        if self._pending and self._flush_timer is None:
+            self._flush_timer = self._dispatcher.call_later(self.delay, self._flush)
+
+    def _flush(self):
+        self._flush_timer = None
+        texts = list(dict.fromkeys(self._pending))  # remove duplicates
+        self._pending.clear()
+        self.show(texts)
+
+    def show(self, texts):
+        """Display the reminders texts."""
+        if CONFIG.getboolean('Reminders', 'notification', fallback=True):
+            try:
+                Popen(["notify-send", "-i", ICON_NOTIF, "Scheduler", '\n'.join(texts)])
+            except Exception:
+                logging.exception('Notifications not supported')
+        if CONFIG.getboolean('Reminders', 'window', fallback=True):
+            if self._window is not None and self._window.winfo_exists():
+                self._window.add_texts(texts)
+                self._window.lift()
+            else:
+                self._window = Notification(self._master, texts)
+
+    def close(self):
+        global _notifier
+        _notifier = None
+        self._dispatcher.cancel(self._timer)
+        self._dispatcher.cancel(self._flush_timer)
+        if self._timer is None:
+            self._master.tk.deletefilehandler(self._read_fd)
+        os.close(self._read_fd)
+        os.close(self._write_fd)
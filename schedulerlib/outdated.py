@@ -0,0 +1,125 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Tracking of the outdated events
+"""
+from datetime import datetime
+from heapq import heappush, heappop
+
+
+def outdated_time(event):
+    """Return the start of the last occurrence of event (None if endless)."""
+    if not event['Repeat']:
+        return event['Start']
+    last = event.get_last_date()
+    if last is None:
+        return None
+    return event['Start'] + (last - event['Start'].date())
+
+
+def end_time(event):
+    """Return the end of the last occurrence of event (None if endless)."""
+    if not event['Repeat']:
+        return event['End']
+    last = event.get_last_date()
+    if last is None:
+        return None
+    return event['End'] + (last - event['Start'].date())
+
+
+class OutdatedTracker:
+    """
+    Mark the events as outdated when their last occurrence starts.
+
+    The events not outdated yet are kept in a min-heap keyed by the time they
+    become outdated and a single timer of the dispatcher is scheduled for the
+    first of them, so nothing is done until an event actually becomes
+    outdated. The heap entries of the modified or removed events are not
+    removed but skipped (they do not match self._times anymore).
+
+    callback is called with the list of the iids of the newly outdated events.
+    Since the dispatcher uses the monotonic clock, the timer is never longer
+    than max_delay seconds so that changes of the system time (suspend,
+    daylight saving time) are caught up.
+    """
+    def __init__(self, dispatcher, callback, max_delay=3600):
+        self._dispatcher = dispatcher
+        self._callback = callback
+        self.max_delay = max_delay
+        self._heap = []   # (time, iid)
+        self._times = {}  # iid: time, for the events not outdated yet
+        self._timer = None
+        self.outdated = set()  # iids of the outdated events
+
+    def __contains__(self, iid):
+        return iid in self.outdated
+
+    def add(self, event):
+        """Add or update event, return whether it is outdated."""
+        iid = event.iid
+        self._times.pop(iid, None)
+        when = outdated_time(event)
+        if when is not None and when <= datetime.now():
+            self.outdated.add(iid)
+            return True
+        self.outdated.discard(iid)
+        if when is not None:
+            self._times[iid] = when
+            heappush(self._heap, (when, iid))
+            if self._heap[0][1] == iid or self._timer is None:
+                self._schedule()
+        return False
+
+    def remove(self, iid):
+        self.outdated.discard(iid)
+        self._times.pop(iid, None)
+
+    def stop(self):
+        self._dispatcher.cancel(self._timer)
+        self._timer = None
+
+    def _schedule(self):
+        heap, times = self._heap, self._times
+        if len(heap) > 2 * len(times) + 64:  # too many stale entries
+            heap[:] = [(when, iid) for when, iid in heap if times.get(iid) == when]
+            heap.sort()
+        while heap and times.get(heap[0][1]) != heap[0][0]:
+            heappop(heap)
+        self._dispatcher.cancel(self._timer)
+        self._timer = None
+        if heap:
+            delay = (heap[0][0] - datetime.now()).total_seconds()
+            self._timer = self._dispatcher.call_later(min(max(delay, 0), self.max_delay),
+                                                      self._check)
+
+    def _check(self):
+        self._timer = None
+        now = datetime.now()
+        heap, times = self._heap, self._times
+        newly = []
+        while heap and heap[0][0] <= now:
+            when, iid = heappop(heap)
+            if times.get(iid) == when:
+                del times[iid]
+                self.outdated.add(iid)
+                newly.append(iid)
+        self._schedule()
+        if newly:
+            self._callback(newly)
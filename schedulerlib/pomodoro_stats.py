@@ -21,16 +21,20 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Pomodoro stats viewer
 """
 import tkinter as tk
+from tkinter import ttk
 import datetime as dt
-import sqlite3
+import logging
+from threading import Thread
+from queue import Queue, Empty
 
 import numpy as np
 import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from matplotlib.dates import DateFormatter
+from matplotlib.dates import DateFormatter, date2num
 
-from schedulerlib.constants import CONFIG, PATH_STATS, scrub
+from schedulerlib.constants import CONFIG
+from schedulerlib.stats_db import STATS_DB
 from schedulerlib.navtoolbar import NavigationToolbar
 
 
@@ -39,6 +43,64 @@ matplotlib.rc("axes.formatter", use_locale=True)
 matplotlib.rc('text', usetex=False)
 matplotlib.rc('font', size=12)
 
+# resampling periods: numpy datetime unit and shift (in days) so that the
+# weeks start on Monday (numpy weeks start on Thursday, like 1970-01-01)
+_PERIODS = {'day': ('D', 0), 'week': ('W', 3), 'month': ('M', 0)}
+_EPOCH = dt.date(1970, 1, 1).toordinal()
+_ERROR = object()  # sent by the worker thread when the loading failed
+
+
+def aggregate(stats, task_ids, period='day', today=None, since=None):
+    """
+    Sum the time worked on each task per period.
+
+    stats: (task_id, day, seconds) array, see StatsDB.get_stats (the rows
+           can already be summed by period)
+    task_ids: ids of the tasks to keep (-1 for a task without stats)
+    period: 'day', 'week' or 'month'
+    today: date ordinal of the last day to include
+    since: date ordinal of the first day to include, by default the first
+           recorded one
+
+    Return (edges, data) where edges are the boundaries (datetime64[D]) of
+    the periods from the first one to today's and data is the (tasks ×
+    periods) array of the hours worked.
+    """
+    unit, shift = _PERIODS[period]
+    unit = 'datetime64[%s]' % unit
+    if today is None:
+        today = dt.date.today().toordinal()
+    task_ids = np.asarray(task_ids, dtype=np.int64)
+    valid = task_ids >= 0
+    lut = np.full(max(stats[:, 0].max(initial=0), task_ids.max(initial=0)) + 1, -1)
+    lut[task_ids[valid]] = np.nonzero(valid)[0]
+    rows = lut[stats[:, 0]]
+    keep = rows >= 0
+    rows = rows[keep]
+    seconds = stats[keep, 2]
+    bins = (stats[keep, 1] - _EPOCH + shift).astype('datetime64[D]').astype(unit).astype(np.int64)
+    last = np.datetime64(today - _EPOCH + shift, 'D').astype(unit).astype(np.int64)
+    last = max(last, bins.max(initial=last))
+    if since is None:
+        first = bins.min(initial=last)
+    else:
+        first = np.datetime64(since - _EPOCH + shift, 'D').astype(unit).astype(np.int64)
+        keep = bins >= first
+        rows = rows[keep]
+        bins = bins[keep]
+        seconds = seconds[keep]
+    data = np.zeros((len(task_ids), last - first + 1))
+    np.add.at(data, (rows, bins - first), seconds / 3600)
+    edges = np.arange(first, last + 2).astype(unit).astype('datetime64[D]') - shift
+    return edges, data
+
+
+def first_day(day, period, back=0):
+    """Return the first day (date ordinal) of the period back periods before day's."""
+    unit, shift = _PERIODS[period]
+    start = np.datetime64(day - _EPOCH + shift, 'D').astype('datetime64[%s]' % unit) - back
+    return int(start.astype('datetime64[D]').astype(np.int64)) - shift + _EPOCH
+
 
 class Stats(tk.Toplevel):
     def __init__(self, master):
@@ -49,75 +111,156 @@ class Stats(tk.Toplevel):
         self.fig = Figure(dpi=100, facecolor=bg)
         self.ax = self.fig.add_subplot(1, 1, 1)
         self.figAgg = FigureCanvasTkAgg(self.fig, self)
-        self.figAgg.draw()
         self.figAgg.get_tk_widget().pack(fill='both', expand=True)
         self.figAgg.get_tk_widget().configure(bg=bg)
         self.toolbar = NavigationToolbar(self.figAgg, self, self.tight_layout, self.toggle_grid)
+        self._periods = {_('Day'): 'day', _('Week'): 'week', _('Month'): 'month'}
+        self.period = ttk.Combobox(self.toolbar, values=list(self._periods), width=8,
+                                   state='readonly')
+        self.period.set(_('Day'))
+        self.period.pack(side='right', padx=4)
+        self.period.bind('<<ComboboxSelected>>', self.plot_stats)
+
+        # the statistics are loaded in a thread and sent back through a queue
+        self._queue = Queue()
+        self._load_id = 0
+        self._poll_id = None
+
+        # current period's bars are animated: they are redrawn over a cached
+        # background (blitting) when a session is recorded
+        self._tasks = []
+        self._data = None
+        self._edges = None
+        self._today_bars = []
+        self._background = None
+        self.figAgg.mpl_connect('draw_event', self._on_draw)
 
+        self.ax.text(0.5, 0.5, _('Loading...'), transform=self.ax.transAxes,
+                     ha='center', va='center')
+        self.figAgg.draw_idle()
         self.plot_stats()
 
+    def destroy(self):
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+            self._poll_id = None
+        tk.Toplevel.destroy(self)
+
     def toggle_grid(self):
         self.ax.grid()
-        self.figAgg.draw()
+        self.figAgg.draw_idle()
 
     def tight_layout(self):
         self.fig.tight_layout()
-        self.figAgg.draw()
-
-    def plot_stats(self):
-        tasks = [t.capitalize() for t in CONFIG.options("PomodoroTasks")]
-        tasks.sort()
-        coul = [CONFIG.get("PomodoroTasks", task) for task in tasks]
-        stats_x = []
-        stats_y = []
-        demain = dt.date.today().toordinal() + 1
-        min_x = demain
-
-        # récupération des données
-        no_data = True
-        db = sqlite3.connect(PATH_STATS)
-        cursor = db.cursor()
-        for i, task in enumerate(tasks):
-            name = task.lower().replace(' ', '_')
-            try:
-                cursor.execute('SELECT date, work FROM {}'.format(scrub(name)))
-                data = cursor.fetchall()
-            except sqlite3.OperationalError:
-                # task was never worked
-                stats_x.append([demain - 1])
-                stats_y.append(np.array([0]))
-            else:
-                no_data = False
-                x = []
-                y = []
-                for date, work in data:
-                    x.append(date)
-                    y.append(work / 60)
-                min_x = min(x[0], min_x)
-                stats_x.append(x)
-                stats_y.append(y)
-        db.close()
-
-        # plots
-        xx = np.arange(min_x, demain, dtype=float)
-        yy0 = np.zeros_like(xx)  # pour empiler les stats
-        if not no_data:
-            for (i, task), x, y in zip(enumerate(tasks), stats_x, stats_y):
-                yy = np.array([], dtype=int)
-                # comble les trous par des 0
-                # ainsi, les jours où une tâche n'a pas été travaillée correspondent
-                # à des 0 sur le graph
-                xxx = np.arange(min_x, x[0])
-                yy = np.concatenate((yy, np.zeros_like(xxx, dtype=int)))
-                for j in range(len(x) - 1):
-                    xxx = np.arange(x[j], x[j + 1])
-                    yy = np.concatenate((yy, [y[j]], np.zeros(len(xxx) - 1, dtype=int)))
-                xxx = np.arange(x[-1], demain)
-                yy = np.concatenate((yy, [y[-1]], np.zeros(len(xxx) - 1, dtype=int)))
-                self.ax.bar(xx, yy, bottom=yy0, width=0.8, label=task, color=coul[i])
-                yy0 += yy
+        self.figAgg.draw_idle()
+
+    def _on_draw(self, event):
+        """Cache the background after a full redraw."""
+        self._background = self.figAgg.copy_from_bbox(self.fig.bbox)
+        for bar in self._today_bars:
+            self.ax.draw_artist(bar)
+
+    def add_time(self, task, seconds):
+        """Add the seconds of work on task recorded today to the plot."""
+        task = task.lower()
+        today = np.datetime64(dt.date.today(), 'D')
+        if (self._poll_id is not None or task not in self._tasks or not self._today_bars
+                or not self._edges[-2] <= today < self._edges[-1]):
+            # loading, new task or new period: reload everything
+            self.plot_stats()
+            return
+        data = self._data[:, -1]
+        data[self._tasks.index(task)] += seconds / 3600
+        bottom = 0
+        for bar, height in zip(self._today_bars, data):
+            bar.set_y(bottom)
+            bar.set_height(height)
+            bottom += height
+        if bottom > self.ax.get_ylim()[1] or self._background is None:
+            self.ax.set_ylim(0, 1.1 * bottom)
+            self.figAgg.draw_idle()
+        else:
+            self.figAgg.restore_region(self._background)
+            for bar in self._today_bars:
+                self.ax.draw_artist(bar)
+            self.figAgg.blit(self.fig.bbox)
+
+    def plot_stats(self, event=None):
+        """Load the statistics in the background and plot them."""
+        tasks = sorted(CONFIG.options("PomodoroTasks"))
+        period = self._periods[self.period.get()]
+        self._load_id += 1
+        Thread(target=self._load, args=(self._load_id, tasks, period), daemon=True).start()
+        if self._poll_id is None:
+            self._poll()
+
+    def _load(self, load_id, tasks, period):
+        """Aggregate the last 30 periods, then the full history (worker thread)."""
+        try:
+            ids = STATS_DB.get_task_ids()
+            ids = [ids.get(t, -1) for t in tasks]
+            today = dt.date.today().toordinal()
+            since = first_day(today, period, 29)
+            edges, data = aggregate(STATS_DB.get_stats(period, since), ids, period, today, since)
+            self._queue.put((load_id, tasks, edges, data, False))
+            edges, data = aggregate(STATS_DB.get_stats(period), ids, period, today)
+            self._queue.put((load_id, tasks, edges, data, True))
+        except Exception as e:
+            logging.exception('Cannot load the pomodoro statistics')
+            self._queue.put((load_id, _ERROR, str(e), None, True))
+        finally:
+            STATS_DB.close()
+
+    def _poll(self):
+        """Plot the data loaded by the worker thread."""
+        loaded = False
+        try:
+            while True:
+                load_id, tasks, edges, data, full = self._queue.get_nowait()
+                if load_id != self._load_id:
+                    continue
+                if tasks is _ERROR:
+                    self._show_error(edges)
+                else:
+                    self._plot(tasks, edges, data, full)
+                loaded = full
+        except Empty:
+            pass
+        if loaded:
+            self._poll_id = None
+        else:
+            self._poll_id = self.after(50, self._poll)
+
+    def _show_error(self, msg):
+        """Display the error that occurred when loading the statistics."""
+        self.ax.clear()
+        self._tasks = []
+        self._data = None
+        self._today_bars = []
+        self.ax.text(0.5, 0.5, _('Cannot load the statistics:') + '\n' + msg,
+                     transform=self.ax.transAxes, ha='center', va='center', wrap=True)
+        self.figAgg.draw_idle()
+
+    def _plot(self, tasks, edges, data, full):
+        """Plot data, full is False if only the last periods are loaded."""
+        self.ax.clear()
+        self._tasks = tasks
+        self._data = data
+        self._edges = edges
+        self._today_bars = []
+        x = date2num(edges)
+        if data.any():
+            # stacked bars, taking 80% of the period
+            widths = np.diff(x)
+            left = x[:-1] + 0.1 * widths
+            bottoms = np.cumsum(data, axis=0) - data
+            for task, y, bottom in zip(tasks, data, bottoms):
+                bars = self.ax.bar(left, y, bottom=bottom, width=0.8 * widths, align='edge',
+                                   label=task.capitalize(), color=CONFIG.get("PomodoroTasks", task))
+                bars.patches[-1].set_animated(True)
+                self._today_bars.append(bars.patches[-1])
             self.ax.xaxis.set_major_formatter(DateFormatter('%x'))
-            self.ax.set_xlim(min_x - 0.5, demain - 0.5)
+            self.ax.set_xlim(x[0], x[-1])
             self.ax.set_ylabel(_("time (h)"))
             self.ax.set_xlabel(_("date"))
             self.ax.xaxis_date()
@@ -129,13 +272,18 @@ class Stats(tk.Toplevel):
                 lgd.set_draggable(True)
             except AttributeError:
                 lgd.draggable(True)
-            max_y = yy0.max()
+            max_y = data.sum(axis=0).max()
             self.ax.set_ylim(0, max_y + 0.1 * max_y)
             self.ax.tick_params('x', rotation=70)
             self.update_idletasks()
             self.fig.tight_layout()
-        self.figAgg.draw()
-        self.toolbar.push_current()
-        self.ax.set_xlim(max(demain - 30, min_x) - 0.5, demain - 0.5)
-        self.toolbar.push_current()
-        self.figAgg.draw()
+        elif not full:
+            self.ax.text(0.5, 0.5, _('Loading...'), transform=self.ax.transAxes,
+                         ha='center', va='center')
+        self.figAgg.draw_idle()
+        if full:
+            self.toolbar.update()  # reset the navigation history
+            self.toolbar.push_current()
+            # show the last 30 periods
+            self.ax.set_xlim(x[max(len(x) - 31, 0)], x[-1])
+            self.toolbar.push_current()
@@ -0,0 +1,179 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Expansion of the repetition rules of the events
+
+A repetition rule is the 'Repeat' property of an event:
+
+    {'Frequency': 'year' | 'month' | 'week',
+     'Limit': 'always' | 'until' | 'after',
+     'EndDate': date,         # last allowed day if Limit is 'until'
+     'NbTimes': int,          # number of occurrences if Limit is 'after'
+     'WeekDays': [int, ...]}  # days of the week (Monday = 0) if weekly
+
+Yearly and monthly events occur on the day of the month of their start
+date, the months (years) without such a day being skipped, like the
+cron triggers of the reminders.
+"""
+from datetime import date, timedelta
+from itertools import islice
+
+
+def _to_date(day):
+    return date.fromordinal(day.toordinal())
+
+
+def _make_date(year, month, day):
+    """Return date(year, month, day) or None if the month has no such day."""
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _months(year, month):
+    """Yield (year, month) from the given month on."""
+    while True:
+        yield year, month
+        month += 1
+        if month == 13:
+            month = 1
+            year += 1
+
+
+def _expand(start, repeat, after):
+    """Yield the occurrences from max(start, after) on, without limit."""
+    first = max(start, after)
+    freq = repeat['Frequency']
+    if freq == 'week':
+        week_days = sorted(repeat['WeekDays'])
+        if not week_days:
+            return
+        # offset of the first occurrence of each week day from first
+        offsets = sorted((wd - first.weekday()) % 7 for wd in week_days)
+        ordinal = first.toordinal()
+        while True:
+            for offset in offsets:
+                yield date.fromordinal(ordinal + offset)
+            ordinal += 7
+    elif freq == 'month':
+        for year, month in _months(first.year, first.month):
+            day = _make_date(year, month, start.day)
+            if day is not None and day >= first:
+                yield day
+    else:
+        year = first.year
+        while True:
+            day = _make_date(year, start.month, start.day)
+            if day is not None and day >= first:
+                yield day
+            year += 1
+
+
+def _previous(start, repeat, day):
+    """Return the last occurrence on or before day (None if before start)."""
+    freq = repeat['Frequency']
+    if freq == 'week':
+        week_days = repeat['WeekDays']
+        for k in range(7):
+            d = day - timedelta(days=k)
+            if d < start:
+                return None
+            if d.weekday() in week_days:
+                return d
+        return None
+    elif freq == 'month':
+        year, month = day.year, day.month
+        while (year, month) >= (start.year, start.month):
+            d = _make_date(year, month, start.day)
+            if d is not None and d <= day:
+                return d
+            month -= 1
+            if month == 0:
+                month = 12
+                year -= 1
+        return None
+    else:
+        for year in range(day.year, start.year - 1, -1):
+            d = _make_date(year, start.month, start.day)
+            if d is not None and d <= day:
+                return d
+        return None
+
+
+def last_occurrence(start, repeat):
+    """
+    Return the date of the last occurrence of the event.
+
+    Return None if the event is repeated endlessly.
+    """
+    start = _to_date(start)
+    if not repeat:
+        return start
+    limit = repeat['Limit']
+    if limit == 'until':
+        last = _previous(start, repeat, _to_date(repeat['EndDate']))
+        return start if last is None else last
+    elif limit == 'after':
+        nb = max(repeat['NbTimes'], 1)
+        if repeat['Frequency'] == 'week':
+            week_days = repeat['WeekDays']
+            if not week_days:
+                return None
+            offsets = sorted((wd - start.weekday()) % 7 for wd in week_days)
+            q, r = divmod(nb - 1, len(offsets))
+            return start + timedelta(days=7 * q + offsets[r])
+        last = None
+        for last in islice(_expand(start, repeat, start), nb):
+            pass
+        return last
+    else:
+        return None
+
+
+def occurrences(start, repeat, after=None, before=None, last=None):
+    """
+    Yield lazily the dates of the occurrences in [after, before].
+
+    start: start date of the event
+    repeat: repetition rule (empty for a one-time event)
+    after, before: bounds of the window, None meaning unbounded
+    last: date of the last occurrence if already known (see last_occurrence)
+    """
+    start = _to_date(start)
+    after = start if after is None else _to_date(after)
+    if not repeat:
+        if after <= start and (before is None or start <= _to_date(before)):
+            yield start
+        return
+    if last is None and repeat['Limit'] != 'always':
+        last = last_occurrence(start, repeat)
+        if last is None:
+            return
+    if before is None:
+        end = last
+    else:
+        end = _to_date(before)
+        if last is not None and last < end:
+            end = last
+    for day in _expand(start, repeat, after):
+        if end is not None and day > end:
+            return
+        yield day
@@ -20,38 +20,41 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 Task manager (main app)
 """
-import os
-import shutil
 import logging
 import traceback
 import signal
-from pickle import Pickler, Unpickler
+from contextlib import contextmanager
 from tkinter import Tk, Menu, StringVar, TclError, BooleanVar
 from tkinter import PhotoImage as tkPhotoImage
-from tkinter.ttk import Button, Treeview, Style, Label, Combobox, Frame
+from tkinter.ttk import Button, Style, Label, Combobox, Frame, Entry
 from datetime import datetime, timedelta
 
-from babel.dates import get_date_format
 from PIL import Image
 from PIL.ImageTk import PhotoImage
-from dateutil.parser import parse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.schedulers import SchedulerNotRunningError
 from apscheduler.triggers.cron import CronTrigger
 
 from schedulerlib.messagebox import showerror
 from schedulerlib.constants import ICON48, ICON, IM_ADD, CONFIG, IM_DOT, JOBSTORE, \
-    DATA_PATH, BACKUP_PATH, IM_SCROLL_ALPHA, active_color, backup, add_trace, \
+    IM_SCROLL_ALPHA, active_color, backup, add_trace, \
     IM_SOUND, IM_MUTE, IM_SOUND_DIS, IM_MUTE_DIS, IM_CLOSED, IM_OPENED, \
-    IM_CLOSED_SEL, IM_OPENED_SEL, ICON_FALLBACK, format_time
+    IM_CLOSED_SEL, IM_OPENED_SEL, ICON_FALLBACK, format_time, TASK_REV_TRANSLATION
 from schedulerlib.trayicon import TrayIcon, SubMenu
 from schedulerlib.form import Form
 from schedulerlib.event import Event
+from schedulerlib.event_store import EventStore
+from schedulerlib.jobstore import SQLiteJobStore
+from schedulerlib.event_index import EventIndex
+from schedulerlib.event_filter import EventFilter
+from schedulerlib.outdated import OutdatedTracker, end_time
 from schedulerlib.widgets import EventWidget, Timer, TaskWidget, Pomodoro, CalendarWidget
-from schedulerlib.settings import Settings
-from schedulerlib.ttkwidgets import AutoScrollbar
+from schedulerlib.ttkwidgets import AutoScrollbar, VirtualTreeview
 from schedulerlib.about import About
 from schedulerlib.eyes import Eyes
+from schedulerlib.clock import TickSource
+from schedulerlib.dispatcher import Dispatcher, EventPump
+from schedulerlib.notifier import Notifier, notify
 
 
 class EventScheduler(Tk):
@@ -62,6 +65,10 @@ class EventScheduler(Tk):
         self._visible = BooleanVar(self, False)
         self.withdraw()
 
+        # timer of all the periodic tasks
+        self.dispatcher = Dispatcher(self)
+        self.notifier = Notifier(self, self.dispatcher)
+
         self.icon_img = PhotoImage(master=self, file=ICON48)
         self.iconphoto(True, self.icon_img)
 
@@ -110,8 +117,8 @@ class EventScheduler(Tk):
 
         self.scheduler = BackgroundScheduler(coalesce=False,
                                              misfire_grace_time=86400)
-        self.scheduler.add_jobstore('sqlalchemy',
-                                    url='sqlite:///%s' % JOBSTORE)
+        self.jobstore = SQLiteJobStore(JOBSTORE)
+        self.scheduler.add_jobstore(self.jobstore)
         self.scheduler.add_jobstore('memory', alias='memo')
         # --- style
         self.style = Style(self)
@@ -265,15 +272,19 @@ class EventScheduler(Tk):
                                                {'expand': '1'})],
                                  'sticky': 'ns'})])
         # --- tree
-        columns = {_('Summary'): ({'stretch': True, 'width': 300}, lambda: self._sort_by_desc(_('Summary'), False)),
-                   _('Place'): ({'stretch': True, 'width': 200}, lambda: self._sort_by_desc(_('Place'), False)),
-                   _('Start'): ({'stretch': False, 'width': 150}, lambda: self._sort_by_date(_('Start'), False)),
-                   _('End'): ({'stretch': False, 'width': 150}, lambda: self._sort_by_date(_("End"), False)),
-                   _('Category'): ({'stretch': False, 'width': 100}, lambda: self._sort_by_desc(_('Category'), False))}
-        self.tree = Treeview(self, show="headings", columns=list(columns))
-        for label, (col_prop, cmd) in columns.items():
+        columns = {_('Summary'): ({'stretch': True, 'width': 300}, 'Summary'),
+                   _('Place'): ({'stretch': True, 'width': 200}, 'Place'),
+                   _('Start'): ({'stretch': False, 'width': 150}, 'Start'),
+                   _('End'): ({'stretch': False, 'width': 150}, 'End'),
+                   _('Category'): ({'stretch': False, 'width': 100}, 'Category')}
+        self.tree = VirtualTreeview(self, show="headings", columns=list(columns),
+                                    valuescommand=lambda iid: self.events[iid].values(),
+                                    stripes=('0', '1'))
+        self._sort_columns = []  # [(property, reverse), ...], primary key first
+        for label, (col_prop, prop) in columns.items():
             self.tree.column(label, **col_prop)
-            self.tree.heading(label, text=label, anchor="w", command=cmd)
+            self.tree.heading(label, text=label, anchor="w",
+                              command=lambda c=label, p=prop: self._sort_by(c, p, False))
         self.tree.tag_configure('0', background='#ececec')
         self.tree.tag_configure('1', background='white')
         self.tree.tag_configure('outdated', foreground='red')
@@ -287,15 +298,27 @@ class EventScheduler(Tk):
         Button(toolbar, image=self.img_plus, padding=1,
                command=self.add).pack(side="left", padx=4)
         Label(toolbar, text=_("Filter by")).pack(side="left", padx=4)
-        # --- TODO: add filter by start date (after date)
+        self._filter_fields = {_("Category"): 'Category', _("Place"): 'Place',
+                               _("Task"): 'Task'}
         self.filter_col = Combobox(toolbar, state="readonly",
-                                   # values=("",) + self.tree.cget('columns')[1:],
-                                   values=("", _("Category")),
+                                   values=("",) + tuple(self._filter_fields),
                                    exportselection=False)
         self.filter_col.pack(side="left", padx=4)
         self.filter_val = Combobox(toolbar, state="readonly",
                                    exportselection=False)
         self.filter_val.pack(side="left", padx=4)
+        Label(toolbar, text=_("Period")).pack(side="left", padx=4)
+        self._periods = {_('Today'): 'today', _('Next 7 days'): 'week',
+                         _('This month'): 'month', _('Upcoming'): 'upcoming'}
+        self.filter_period = Combobox(toolbar, state="readonly",
+                                      values=("",) + tuple(self._periods),
+                                      exportselection=False)
+        self.filter_period.pack(side="left", padx=4)
+        Label(toolbar, text=_("Search")).pack(side="left", padx=4)
+        self.search_var = StringVar(self)
+        self._search_id = None
+        Entry(toolbar, textvariable=self.search_var,
+              width=20).pack(side="left", padx=4)
         Button(toolbar, text=_('Delete All Outdated'), padding=1,
                command=self.delete_outdated_events).pack(side="right", padx=4)
 
@@ -305,36 +328,35 @@ class EventScheduler(Tk):
         scroll.grid(row=1, column=1, sticky='ns')
 
         # --- restore data
-        data = {}
         self.events = {}
-        self.nb = 0
-        try:
-            with open(DATA_PATH, 'rb') as file:
-                dp = Unpickler(file)
-                data = dp.load()
-        except Exception:
-            l = [f for f in os.listdir(os.path.dirname(BACKUP_PATH)) if f.startswith('data.backup')]
-            if l:
-                l.sort(key=lambda x: int(x[11:]))
-                shutil.copy(os.path.join(os.path.dirname(BACKUP_PATH), l[-1]),
-                            DATA_PATH)
-                with open(DATA_PATH, 'rb') as file:
-                    dp = Unpickler(file)
-                    data = dp.load()
-        self.nb = len(data)
+        self.index = EventIndex()
+        self.filter = EventFilter()
+        self.outdated = OutdatedTracker(self.dispatcher, self._mark_outdated)
+        # delayed refresh of the widgets and database
+        self._refresh_id = None
+        self._bulk = 0
+        self._dirty_widgets = set()
+        self._unsaved = set()
+        self._deleted = set()
+        self.store = EventStore()
+        data = self.store.load()
+        self.nb = max([int(iid) for iid, prop in data], default=0)
         backup()
         now = datetime.now()
-        for i, prop in enumerate(data):
-            iid = str(i)
+        expired = []
+        for iid, prop in data:
             self.events[iid] = Event(self.scheduler, iid=iid, **prop)
-            self.tree.insert('', 'end', iid, values=self.events[str(i)].values())
-            tags = [str(self.tree.index(iid) % 2)]
-            self.tree.item(iid, tags=tags)
+            self.index.add(self.events[iid])
+            self.filter.add(self.events[iid])
+            outdated = self.outdated.add(self.events[iid])
+            self.tree.insert('', 'end', iid, tags=('outdated',) if outdated else ())
             if not prop['Repeat']:
                 for rid, d in list(prop['Reminders'].items()):
                     if d < now:
                         del self.events[iid]['Reminders'][rid]
-        self.after_id = self.after(15 * 60 * 1000, self.check_outdated)
+                        expired.append(iid)
+        # persist the removal of the expired reminders
+        self.store.save_many((iid, self.events[iid].to_dict()) for iid in set(expired))
 
         # --- bindings
         self.bind_class("TCombobox", "<<ComboboxSelected>>",
@@ -349,12 +371,16 @@ class EventScheduler(Tk):
         self.menu.bind('<FocusOut>', lambda e: self.menu.unpost())
         self.filter_col.bind("<<ComboboxSelected>>", self.update_filter_val)
         self.filter_val.bind("<<ComboboxSelected>>", self.apply_filter)
+        self.filter_period.bind("<<ComboboxSelected>>", self.apply_filter)
+        add_trace(self.search_var, 'write', self._search)
 
         # --- widgets
+        self.ticks = TickSource(self.dispatcher)  # shared tick of the Timer and Pomodoro
         self.widgets = {}
         prop = {op: CONFIG.get('Calendar', op) for op in CONFIG.options('Calendar')}
         self.widgets['Calendar'] = CalendarWidget(self,
                                                   locale=CONFIG.get('General', 'locale'),
+                                                  index=self.index,
                                                   **prop)
         self.widgets['Events'] = EventWidget(self)
         self.widgets['Tasks'] = TaskWidget(self)
@@ -370,7 +396,8 @@ class EventScheduler(Tk):
             add_trace(widget.variable, 'write',
                       lambda *args, i=item: self._menu_widgets_trace(i))
 
-        self.icon.loop(self)
+        self.icon_pump = EventPump(self.dispatcher, self, self.icon)
+        self.icon_pump.start()
         self.tk.eval("""
 apply {name {
     set newmap {}
@@ -401,7 +428,17 @@ apply {name {
                                CronTrigger(hour=0, minute=0, second=1),
                                jobstore='memo')
 
-        self.scheduler.start()
+        self.scheduler.start(paused=True)
+        self._migrate_reminders()
+        self.scheduler.resume()
+
+    def _migrate_reminders(self):
+        """Make the reminders created by older versions use notify."""
+        with self.jobstore.batch():
+            for job in self.scheduler.get_jobs():
+                if job.func_ref == 'subprocess:run' and len(job.args[0]) == 3:
+                    # job.args = (['python3', '/path/to/notif.py', text],)
+                    job.modify(func=notify, args=(job.args[0][2],))
 
     def _setup_style(self):
         # scrollbars
@@ -434,12 +471,56 @@ apply {name {
         logging.error(err)
         showerror('Exception', str(args[1]), err, parent=self)
 
-    def save(self):
-        logging.info('Save event database')
-        data = [ev.to_dict() for ev in self.events.values()]
-        with open(DATA_PATH, 'wb') as file:
-            pick = Pickler(file)
-            pick.dump(data)
+    # --- delayed refresh
+    def invalidate(self, iid=None, deleted=False, widgets=('Calendar', 'Events', 'Tasks')):
+        """
+        Mark widgets for redraw and event iid for saving (or deletion).
+
+        The changes are flushed once the application is idle (or at the end
+        of a bulk() block), so that successive modifications only trigger
+        one redraw and one database transaction.
+        """
+        self._dirty_widgets.update(widgets)
+        if iid is not None:
+            if deleted:
+                self._unsaved.discard(iid)
+                self._deleted.add(iid)
+            else:
+                self._deleted.discard(iid)
+                self._unsaved.add(iid)
+        if not self._bulk and self._refresh_id is None:
+            self._refresh_id = self.after_idle(self.flush)
+
+    def flush(self):
+        """Write the modified events and redraw the invalidated widgets."""
+        if self._refresh_id is not None:
+            self.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        if self._deleted:
+            self.store.delete_many(self._deleted)
+            self._deleted.clear()
+        if self._unsaved:
+            self.store.save_many((iid, self.events[iid].to_dict()) for iid in self._unsaved)
+            self._unsaved.clear()
+        widgets = self._dirty_widgets
+        self._dirty_widgets = set()
+        if 'Calendar' in widgets:
+            self.widgets['Calendar'].update_events()
+        if 'Events' in widgets:
+            self.widgets['Events'].display_evts()
+        if 'Tasks' in widgets:
+            self.widgets['Tasks'].display_tasks()
+
+    @contextmanager
+    def bulk(self):
+        """Delay all refreshes until the end of the block."""
+        self._bulk += 1
+        try:
+            yield
+        finally:
+            self._bulk -= 1
+            if not self._bulk:
+                self.flush()
 
     def update_date(self, *args):
         """Update Calendar's selected day and Events' list."""
@@ -483,7 +564,6 @@ apply {name {
     def hide(self):
         self._visible.set(False)
         self.withdraw()
-        self.save()
 
     def show(self):
         self._visible.set(True)
@@ -500,7 +580,6 @@ apply {name {
         self._visible.set(value)
         if not value:
             self.withdraw()
-            self.save()
         else:
             self.deiconify()
 
@@ -509,19 +588,20 @@ apply {name {
         self.nb += 1
         iid = str(self.nb)
         self.events[iid] = event
-        self.tree.insert('', 'end', iid, values=event.values())
-        self.tree.item(iid, tags=str(self.tree.index(iid) % 2))
-        self.widgets['Calendar'].add_event(event)
-        self.widgets['Events'].display_evts()
-        self.widgets['Tasks'].display_tasks()
-        self.save()
+        outdated = self.outdated.add(event)
+        self.tree.insert('', 'end', iid, values=event.values(),
+                         tags=('outdated',) if outdated else ())
+        self.index.add(event)
+        self.filter.add(event)
+        self.invalidate(iid)
 
     def event_configure(self, iid):
-        self.tree.item(iid, values=self.events[iid].values())
-        self.widgets['Calendar'].add_event(self.events[iid])
-        self.widgets['Events'].display_evts()
-        self.widgets['Tasks'].display_tasks()
-        self.save()
+        outdated = self.outdated.add(self.events[iid])
+        self.tree.item(iid, values=self.events[iid].values(),
+                       tags=('outdated',) if outdated else ())
+        self.index.add(self.events[iid])
+        self.filter.add(self.events[iid])
+        self.invalidate(iid)
 
     def add(self, date=None):
         iid = str(self.nb + 1)
@@ -532,52 +612,43 @@ apply {name {
         Form(self, event, new=True)
 
     def delete(self, iid):
-        index = self.tree.index(iid)
-        self.tree.delete(iid)
-        for k, item in enumerate(self.tree.get_children('')[index:]):
-            tags = [t for t in self.tree.item(item, 'tags')
-                    if t not in ['1', '0']]
-            tags.append(str((index + k) % 2))
-            self.tree.item(item, tags=tags)
-
-        self.events[iid].reminder_remove_all()
-        self.widgets['Calendar'].remove_event(self.events[iid])
-        del(self.events[iid])
-        self.widgets['Events'].display_evts()
-        self.widgets['Tasks'].display_tasks()
-        self.save()
+        self.delete_many([iid])
+
+    def delete_many(self, iids):
+        """Delete the events iids, with a single update of the view and database."""
+        iids = list(iids)
+        if not iids:
+            return
+        self.tree.delete(*iids)
+        job_ids = []
+        for iid in iids:
+            reminders = self.events[iid]['Reminders']
+            job_ids.extend(reminders)
+            reminders.clear()
+        self.jobstore.remove_jobs(job_ids)
+        with self.bulk():
+            for iid in iids:
+                self.index.remove(iid)
+                self.filter.remove(iid)
+                self.outdated.remove(iid)
+                del(self.events[iid])
+                self.invalidate(iid, deleted=True)
 
     def edit(self, iid):
-        self.widgets['Calendar'].remove_event(self.events[iid])
         Form(self, self.events[iid])
 
-    def check_outdated(self):
-        """Check for outdated events every 15 min."""
-        now = datetime.now()
-        for iid, event in self.events.items():
-            if not event['Repeat'] and event['Start'] < now:
-                tags = list(self.tree.item(iid, 'tags'))
-                if 'outdated' not in tags:
-                    tags.append('outdated')
-                self.tree.item(iid, tags=tags)
-        self.after_id = self.after(15 * 60 * 1000, self.check_outdated)
+    def _mark_outdated(self, iids):
+        """Tag the newly outdated events."""
+        for iid in iids:
+            self.tree.item(iid, tags=('outdated',))
 
     def delete_outdated_events(self):
         now = datetime.now()
-        outdated = []
-        for iid, prop in self.events.items():
-            if prop['End'] < now:
-                if not prop['Repeat']:
-                    outdated.append(iid)
-                elif prop['Repeat']['Limit'] != 'always':
-                    end = prop['End']
-                    enddate = datetime.fromordinal(prop['Repeat']['EndDate'].toordinal())
-                    enddate.replace(hour=end.hour, minute=end.minute)
-                    if enddate < now:
-                        outdated.append(iid)
-        for item in outdated:
-            self.delete(item)
-        logging.info('Deleted outdated events')
+        # the events are finished after their last occurrence started
+        outdated = [iid for iid in self.outdated.outdated
+                    if end_time(self.events[iid]) < now]
+        self.delete_many(outdated)
+        logging.info('Deleted %i outdated events', len(outdated))
 
     def refresh_reminders(self):
         """
@@ -585,81 +656,88 @@ apply {name {
 
         Required when APScheduler is updated.
         """
-        for event in self.events.values():
-            reminders = [date for date in event['Reminders'].values()]
-            event.reminder_remove_all()
-            for date in reminders:
-                event.reminder_add(date)
+        with self.bulk(), self.jobstore.batch():
+            # the jobs that cannot be restored are dropped by get_jobs()
+            jobs = {job.id: job for job in self.scheduler.get_jobs(jobstore='default')}
+            for iid, event in self.events.items():
+                if event.set_reminders(list(event['Reminders'].values()), jobs):
+                    self.invalidate(iid, widgets=())
         logging.info('Refreshed reminders')
 
     # --- sorting
-    def _move_item(self, item, index):
-        self.tree.move(item, "", index)
-        tags = [t for t in self.tree.item(item, 'tags')
-                if t not in ['1', '0']]
-        tags.append(str(index % 2))
-        self.tree.item(item, tags=tags)
-
-    @staticmethod
-    def to_datetime(date):
-        date_format = get_date_format("short", CONFIG.get("General", "locale")).pattern
-        dayfirst = date_format.startswith("d")
-        yearfirst = date_format.startswith("y")
-        return parse(date, dayfirst=dayfirst, yearfirst=yearfirst)
-
-    def _sort_by_date(self, col, reverse):
-        l = [(self.to_datetime(self.tree.set(k, col)), k) for k in self.tree.get_children('')]
-        l.sort(reverse=reverse)
-
-        # rearrange items in sorted positions
-        for index, (val, k) in enumerate(l):
-            self._move_item(k, index)
+    def _sort(self, items):
+        """Return items sorted according to self._sort_columns."""
+        events = self.events
+        # stable sorts from the least significant column to the primary one
+        for prop, reverse in reversed(self._sort_columns):
+            items.sort(key=lambda iid: events[iid].get_sort_key(prop), reverse=reverse)
+        return items
+
+    def _sort_by(self, col, prop, reverse):
+        """Sort by prop, the previous sorting columns being the secondary keys."""
+        self._sort_columns = [(p, r) for p, r in self._sort_columns if p != prop]
+        self._sort_columns.insert(0, (prop, reverse))
+        del self._sort_columns[3:]
+        items = list(self.tree.get_children(''))
+        items.sort(key=lambda iid: self.events[iid].get_sort_key(prop), reverse=reverse)
+        self.tree.set_children('', items)
 
         # reverse sort next time
         self.tree.heading(col,
-                          command=lambda: self._sort_by_date(col, not reverse))
-
-    def _sort_by_desc(self, col, reverse):
-        l = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
-        l.sort(reverse=reverse, key=lambda x: x[0].lower())
-
-        # rearrange items in sorted positions
-        for index, (val, k) in enumerate(l):
-            self._move_item(k, index)
-
-        # reverse sort next time
-        self.tree.heading(col,
-                          command=lambda: self._sort_by_desc(col, not reverse))
+                          command=lambda: self._sort_by(col, prop, not reverse))
 
     # --- filter
     def update_filter_val(self, event):
         col = self.filter_col.get()
         self.filter_val.set("")
         if col:
-            l = set()
-            for k in self.events:
-                l.add(self.tree.set(k, col))
-
-            self.filter_val.configure(values=tuple(l))
+            field = self._filter_fields[col]
+            values = self.filter.values(field)
+            if field == 'Task':
+                values = [_(val) for val in values]
+            self.filter_val.configure(values=values)
         else:
             self.filter_val.configure(values=[])
             self.apply_filter(event)
 
-    def apply_filter(self, event):
+    def _get_period(self):
+        """Return the (after, before) bounds of the selected period."""
+        period = self._periods.get(self.filter_period.get())
+        now = datetime.now()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == 'today':
+            return today, today + timedelta(days=1, microseconds=-1)
+        elif period == 'week':
+            return now, today + timedelta(days=7, microseconds=-1)
+        elif period == 'month':
+            start = today.replace(day=1)
+            end = (start + timedelta(days=32)).replace(day=1)
+            return start, end - timedelta(microseconds=1)
+        elif period == 'upcoming':
+            return now, None
+        else:
+            return None, None
+
+    def _search(self, *args):
+        """Filter the events once the user stops typing."""
+        if self._search_id:
+            self.after_cancel(self._search_id)
+        self._search_id = self.after(200, self.apply_filter)
+
+    def apply_filter(self, event=None):
+        """Display the events matching all the filters."""
         col = self.filter_col.get()
         val = self.filter_val.get()
-        items = list(self.events.keys())
-        if not col:
-            for item in items:
-                self._move_item(item, int(item))
-        else:
-            i = 0
-            for item in items:
-                if self.tree.set(item, col) == val:
-                    self._move_item(item, i)
-                    i += 1
-                else:
-                    self.tree.detach(item)
+        criteria = {}
+        if col and val:
+            field = self._filter_fields[col]
+            if field == 'Task':
+                val = TASK_REV_TRANSLATION.get(val, val)
+            criteria[field] = val
+        after, before = self._get_period()
+        res = self.filter.filter(criteria, after, before, self.search_var.get())
+        items = [iid for iid in self.events if iid in res]
+        self.tree.set_children('', self._sort(items))
 
     # --- manager's menu
     def _post_menu(self, event):
@@ -693,7 +771,9 @@ apply {name {
     def _set_progress(self):
         if self.right_click_iid:
             self.events[self.right_click_iid]['Task'] = self._task_var.get()
-            self.widgets['Tasks'].display_tasks()
+            self.index.add(self.events[self.right_click_iid])
+            self.filter.add(self.events[self.right_click_iid])
+            self.invalidate(self.right_click_iid, widgets=('Tasks',))
             if '%' in self._task_var.get():
                 self._img_dot = PhotoImage(master=self, file=IM_DOT)
             else:
@@ -702,12 +782,14 @@ apply {name {
 
     # --- icon menu
     def exit(self):
-        self.save()
         rep = self.widgets['Pomodoro'].stop(self.widgets['Pomodoro'].on)
         if not rep:
             return
         self.menu_eyes.quit()
-        self.after_cancel(self.after_id)
+        self.icon_pump.stop()
+        self.dispatcher.stop()
+        self.notifier.close()
+        self.flush()
         try:
             self.scheduler.shutdown()
         except SchedulerNotRunningError:
@@ -715,6 +797,8 @@ apply {name {
         self.destroy()
 
     def settings(self):
+        from schedulerlib.settings import Settings
+
         splash_supp = CONFIG.get('General', 'splash_supported', fallback=True)
         dialog = Settings(self)
         self.wait_window(dialog)
@@ -725,13 +809,19 @@ apply {name {
 
     # --- week schedule
     def get_next_week_events(self):
-        """Return events scheduled for the next 7 days """
+        """
+        Return events scheduled for the next 7 days.
+
+        The result is {date: [(iid, text, description), ...]} with the days
+        in chronological order.
+        """
         locale = CONFIG.get("General", "locale")
         next_ev = {}
         today = datetime.now().date()
+        week = self.index.get_events_between(today, today + timedelta(days=6))
         for d in range(7):
             day = today + timedelta(days=d)
-            evts = self.widgets['Calendar'].get_events(day)
+            evts = week.get(day)
             if evts:
                 evts = [self.events[iid] for iid in evts]
                 evts.sort(key=lambda ev: ev.get_start_time())
@@ -745,16 +835,14 @@ apply {name {
                     place = "(%s)" % ev['Place']
                     if place == "()":
                         place = ""
-                    desc.append(("%s%s %s\n" % (date, ev['Summary'], place), ev['Description']))
-                next_ev[day.strftime('%A')] = desc
+                    desc.append((ev.iid, "%s%s %s\n" % (date, ev['Summary'], place),
+                                 ev['Description']))
+                next_ev[day] = desc
         return next_ev
 
     # --- tasks
     def get_tasks(self):
         # TODO: find events with repetition in the week
         # TODO: better handling of events on several days
-        tasks = []
-        for event in self.events.values():
-            if event['Task']:
-                tasks.append(event)
-        return tasks
+        tasks = self.index.tasks
+        return [ev for iid, ev in self.events.items() if iid in tasks]
@@ -21,7 +21,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Settings GUI
 """
 import os
-import sqlite3
 from tkinter import Canvas, Toplevel
 from tkinter.ttk import Notebook, Style, Label, Separator, Frame, Entry, Button
 from tkinter.messagebox import showerror, askyesno
@@ -29,7 +28,8 @@ from tkinter.messagebox import showerror, askyesno
 from PIL.ImageTk import PhotoImage
 
 from schedulerlib.constants import IM_COLOR, only_nb, CONFIG, askcolor, \
-    CMAP, IM_ADD, IM_DEL, PATH_STATS, save_config, scrub
+    CMAP, IM_ADD, IM_DEL, save_config
+from schedulerlib.stats_db import STATS_DB
 from schedulerlib.ttkwidgets import AutoScrollbar
 from .color import ColorFrame
 from .opacity import OpacityFrame
@@ -306,14 +306,7 @@ class PomodoroParams(Frame):
         if rep:
             CONFIG.remove_option("PomodoroTasks", task)
             # remove stats
-            db = sqlite3.connect(PATH_STATS)
-            cursor = db.cursor()
-            try:
-                cursor.execute('DROP TABLE {}'.format(scrub(task.lower().replace(' ', '_'))))
-                db.commit()
-            except sqlite3.OperationalError:
-                pass   # no stats yet
-            db.close()
+            STATS_DB.delete_task(task)
             self.tasks[task].destroy()
             self._tasks_btns[task].destroy()
             del self.tasks[task]
@@ -26,7 +26,7 @@ from tkinter import ttk
 from PIL.ImageTk import PhotoImage
 
 from schedulerlib.constants import save_config, CONFIG, LANGUAGES, REV_LANGUAGES, \
-    TOOLKITS, IM_ADD, IM_DEL, only_nb, IM_CLEANUP, IM_REFRESH
+    get_available_gui_toolkits, IM_ADD, IM_DEL, only_nb, IM_CLEANUP, IM_REFRESH
 from schedulerlib.messagebox import showerror, showinfo, askyesno
 from schedulerlib.ttkwidgets import AutoScrollbar
 from .font import FontFrame
@@ -113,10 +113,12 @@ class Settings(tk.Toplevel):
         frame_gui = ttk.Frame(self.frames[_('General')])
         ttk.Label(frame_gui,
                   text=_("GUI Toolkit for the system tray icon")).pack(side="left")
+        # check again the toolkits, in case they were (un)installed
+        toolkits = get_available_gui_toolkits(cache=False)
         self.cb_gui = ttk.Combobox(frame_gui, textvariable=self.gui,
                                    state='readonly', style='menu.TCombobox',
                                    exportselection=False, width=4,
-                                   values=[t.capitalize() for (t, b) in TOOLKITS.items() if b])
+                                   values=[t.capitalize() for (t, b) in toolkits.items() if b])
         self.cb_gui.pack(side="left", padx=4)
         self.cb_gui.bind('<<ComboboxSelected>>', self.change_gui)
         # --- Update checks
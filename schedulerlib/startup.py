@@ -0,0 +1,42 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Timing of the startup phases
+"""
+import logging
+from time import perf_counter
+
+# (phase, end time) of the startup phases, the start is when this module
+# is imported, before the other modules of the application
+PHASES = [('', perf_counter())]
+
+
+def phase(name):
+    """Record the end of the startup phase name."""
+    PHASES.append((name, perf_counter()))
+
+
+def report_startup():
+    """Log the duration of the startup phases."""
+    phase('first display')
+    lines = ['%-15s %8.1f ms' % (name, (end - start) * 1000)
+             for (_n, start), (name, end) in zip(PHASES, PHASES[1:])]
+    lines.append('%-15s %8.1f ms' % ('total', (PHASES[-1][1] - PHASES[0][1]) * 1000))
+    logging.info('Startup time:\n%s', '\n'.join(lines))
@@ -0,0 +1,187 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Pomodoro statistics database
+"""
+import logging
+import sqlite3
+import threading
+from datetime import date
+
+from schedulerlib.constants import CONFIG, PATH_STATS, scrub
+
+
+class StatsDB:
+    """
+    Pomodoro statistics: time worked on each task per day.
+
+    The data is stored in the tables:
+
+        tasks (id, name)
+        sessions (task_id, day, seconds)  # day is the date ordinal
+        weekly (task_id, day, seconds)    # day is the week's Monday
+        monthly (task_id, day, seconds)   # day is the 1st of the month
+
+    The weekly and monthly rollups are updated with the daily sessions so that
+    the statistics can be read at any scale without scanning the sessions.
+
+    A connection is opened once per thread (sqlite3 connections cannot be
+    shared between threads) and kept for the life of the application, in
+    WAL mode so that reading the statistics does not block the recording.
+    """
+    version = 2  # database format, stored in PRAGMA user_version
+    tables = {'day': 'sessions', 'week': 'weekly', 'month': 'monthly'}
+
+    def __init__(self, path=PATH_STATS):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._ready = False
+        self._task_ids = {}
+
+    @property
+    def db(self):
+        """Connection of the current thread."""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('PRAGMA foreign_keys=ON')
+            with self._lock:
+                if not self._ready:
+                    self._setup(db)
+                    self._ready = True
+            self._local.db = db
+        return db
+
+    def _setup(self, db):
+        with db:
+            db.execute('''CREATE TABLE IF NOT EXISTS tasks
+                          (id INTEGER PRIMARY KEY,
+                           name TEXT UNIQUE NOT NULL)''')
+            for table in self.tables.values():
+                db.execute('''CREATE TABLE IF NOT EXISTS {}
+                              (task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+                               day INTEGER NOT NULL,
+                               seconds INTEGER NOT NULL,
+                               PRIMARY KEY (task_id, day)) WITHOUT ROWID'''.format(table))
+                db.execute('CREATE INDEX IF NOT EXISTS {0}_day ON {0}(day)'.format(table))
+            version = db.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                self._migrate(db)
+            if version < 2:
+                self._build_rollups(db)
+            db.execute('PRAGMA user_version = %i' % self.version)
+
+    def _migrate(self, db):
+        """Import the legacy per-task tables (id, date, work in minutes)."""
+        tables = [name for name, in db.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                  if name != 'tasks' and name not in self.tables.values() and not name.startswith('sqlite_')]
+        if not tables:
+            return
+        # the table names were derived from the task names
+        names = {scrub(task.replace(' ', '_')): task for task in CONFIG.options('PomodoroTasks')}
+        for table in tables:
+            task_id = self._get_task_id(names.get(table, table.replace('_', ' ')), db)
+            db.execute('''INSERT INTO sessions (task_id, day, seconds)
+                          SELECT ?, date, SUM(work) * 60 FROM {} GROUP BY date
+                          ON CONFLICT (task_id, day)
+                          DO UPDATE SET seconds = seconds + excluded.seconds'''.format(table),
+                       (task_id,))
+            db.execute('DROP TABLE {}'.format(table))
+        logging.info('Imported pomodoro statistics of %i tasks', len(tables))
+
+    @staticmethod
+    def _build_rollups(db):
+        """Compute the weekly and monthly rollups from the sessions."""
+        db.execute('''INSERT OR REPLACE INTO weekly (task_id, day, seconds)
+                      SELECT task_id, day - (day - 1) % 7 AS week, SUM(seconds)
+                      FROM sessions GROUP BY task_id, week''')
+        # date ordinal <-> julian day: 1 is 0001-01-01
+        db.execute('''INSERT OR REPLACE INTO monthly (task_id, day, seconds)
+                      SELECT task_id,
+                             CAST(julianday(date(day + 1721424.5, 'start of month')) - 1721424.5 AS INTEGER) AS month,
+                             SUM(seconds)
+                      FROM sessions GROUP BY task_id, month''')
+
+    def _get_task_id(self, task, db=None):
+        name = task.lower()
+        try:
+            return self._task_ids[name]
+        except KeyError:
+            if db is None:
+                db = self.db
+            db.execute('INSERT OR IGNORE INTO tasks (name) VALUES (?)', (name,))
+            task_id = db.execute('SELECT id FROM tasks WHERE name=?', (name,)).fetchone()[0]
+            self._task_ids[name] = task_id
+            return task_id
+
+    def add_time(self, task, seconds, day):
+        """Add seconds of work on task on day (date ordinal)."""
+        month = date.fromordinal(day).replace(day=1).toordinal()
+        db = self.db
+        with db:
+            task_id = self._get_task_id(task, db)
+            for table, start in (('sessions', day), ('weekly', day - (day - 1) % 7),
+                                 ('monthly', month)):
+                db.execute('''INSERT INTO {} (task_id, day, seconds) VALUES (?, ?, ?)
+                              ON CONFLICT (task_id, day)
+                              DO UPDATE SET seconds = seconds + excluded.seconds'''.format(table),
+                           (task_id, start, seconds))
+
+    def delete_task(self, task):
+        """Remove task and its statistics."""
+        name = task.lower()
+        db = self.db
+        with db:
+            db.execute('DELETE FROM tasks WHERE name=?', (name,))
+        self._task_ids.pop(name, None)
+
+    def get_task_ids(self):
+        """Return the {task: id} dictionary."""
+        return dict(self.db.execute('SELECT name, id FROM tasks'))
+
+    def get_stats(self, period='day', since=None):
+        """
+        Return the array of the (task_id, day, seconds) rows.
+
+        period: 'day', 'week' or 'month', for the latter two, day is the
+                first day of the period
+        since: if not None, only return the rows from this day (date ordinal) on
+        """
+        import numpy as np  # not loaded at startup
+
+        query = 'SELECT task_id, day, seconds FROM {}'.format(self.tables[period])
+        if since is None:
+            rows = self.db.execute(query).fetchall()
+        else:
+            rows = self.db.execute(query + ' WHERE day >= ?', (since,)).fetchall()
+        return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+    def close(self):
+        """Close the connection of the current thread."""
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+STATS_DB = StatsDB()
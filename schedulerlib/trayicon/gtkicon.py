@@ -21,7 +21,7 @@ System tray icon using Gtk 3.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
 
 APPIND_SUPPORT = 1
 try:
@@ -212,11 +212,36 @@ class TrayIcon:
         """Change icon."""
         self.tray_icon.set_from_file(icon)
 
-    def loop(self, tk_window):
-        """Update Gtk GUI inside tkinter mainloop."""
+    def loop(self):
+        """
+        Update Gtk GUI inside tkinter mainloop.
+
+        Return True if events were processed.
+        """
+        processed = False
         while Gtk.events_pending():
             Gtk.main_iteration()
-        tk_window.loop_id = tk_window.after(10, self.loop, tk_window)
+            processed = True
+        return processed
+
+    @staticmethod
+    def poll_fds():
+        """
+        Return the file descriptors of the Gtk event sources and the time (ms)
+        before the next Gtk timeout (-1 if none).
+
+        The loop needs to run only when one of the file descriptors becomes
+        readable or when the timeout expires.
+        """
+        context = GLib.MainContext.default()
+        if not context.acquire():
+            raise RuntimeError('The GLib main context is owned by another thread.')
+        try:
+            ready, priority = context.prepare()
+            nb, timeout, fds = context.query(priority)
+        finally:
+            context.release()
+        return [fd.fd for fd in fds], 0 if ready else timeout
 
     def _callbacks(self, data, event):
         if event.button == 1:
@@ -24,11 +24,14 @@ import sys
 try:
     from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction
     from PyQt5.QtGui import QIcon
+    from PyQt5.QtCore import QAbstractEventDispatcher, QEventLoop
 except ImportError:
     try:
         from PyQt4.QtGui import QApplication, QSystemTrayIcon, QMenu, QAction, QIcon
+        from PyQt4.QtCore import QAbstractEventDispatcher, QEventLoop
     except ImportError:
         from PySide.QtGui import QApplication, QSystemTrayIcon, QMenu, QAction, QIcon
+        from PySide.QtCore import QAbstractEventDispatcher, QEventLoop
 
 
 class SubMenu(QMenu):
@@ -189,10 +192,13 @@ class TrayIcon(QApplication):
         self.tray_icon.setContextMenu(self.menu)
         self.tray_icon.show()
 
-    def loop(self, tk_window):
-        """Update Qt GUI inside tkinter mainloop."""
-        self.processEvents()
-        tk_window.loop_id = tk_window.after(10, self.loop, tk_window)
+    def loop(self):
+        """
+        Update Qt GUI inside tkinter mainloop (to be called periodically).
+
+        Return True if events were processed.
+        """
+        return QAbstractEventDispatcher.instance().processEvents(QEventLoop.AllEvents)
 
     def change_icon(self, icon, desc=''):
         """Change icon."""
@@ -296,14 +296,15 @@ class TrayIcon(tkinter.BaseWidget, tkinter.Wm):
         self._icon.configure(file=icon)
         self.update()
 
-    def loop(self, tk_window):
+    def loop(self):
         """
-        Periodically force icon update inside tkinter mainloop.
+        Force icon update inside tkinter mainloop (to be called periodically).
 
-        Otherwise the icon can be unresponsive.
+        Otherwise the icon can be unresponsive. The events are processed by
+        tkinter mainloop, so return False.
         """
         self.update_idletasks()
-        tk_window.loop_id = tk_window.after(10, self.loop, tk_window)
+        return False
 
     def bind_left_click(self, command):
         """Bind command to left click on the icon."""
@@ -461,3 +461,359 @@ class AutoScrollbar(ttk.Scrollbar):
     def grid(self, **kw):
         ttk.Scrollbar.grid(self, **kw)
         self._layout = 'grid'
+
+
+class VirtualTreeview(ttk.Treeview):
+    """
+    Flat Treeview that only creates the rows visible in the viewport.
+
+    The items (values and tags) are kept in a python model and a pool of
+    treeview rows, as many as fit in the widget, is recycled to display
+    the visible part of the list when scrolling. The methods used to
+    manipulate the items have the same signature as the Treeview ones,
+    with '' as the only valid parent.
+
+    Additional options:
+
+        valuescommand: function taking an item iid and returning its values,
+                       called the first time the values of an item
+                       inserted without values are needed
+        stripes: sequence of tags given in turn to the displayed items
+                 according to their position (e.g. to alternate the row
+                 background), they are not part of the items' tags
+
+    The changed rows are updated with a single Tcl command per redraw.
+    """
+    _render_cmd = """
+namespace eval ::vtreeview {}
+proc ::vtreeview::render {w changes sel} {
+    foreach {row values tags} $changes {
+        $w item $row -values $values -tags $tags
+    }
+    $w selection set $sel
+}
+"""
+
+    def __init__(self, master=None, **kw):
+        self._yscrollcommand = kw.pop('yscrollcommand', None)
+        self._valuescommand = kw.pop('valuescommand', None)
+        self._stripes = tuple(kw.pop('stripes', ()))
+        ttk.Treeview.__init__(self, master, **kw)
+        self.tk.eval(self._render_cmd)
+        self._items = {}    # iid: {'values': values, 'tags': tags}
+        self._order = []    # attached items
+        self._pos = {}      # iid: index in self._order
+        self._sel = set()   # selected items
+        self._first = 0     # index of the first displayed item
+        self._rows = []     # treeview rows
+        self._row_iids = {}  # row: displayed item iid
+        self._row_state = {}  # row: displayed (values, tags)
+        self._row_sel = set()  # selected rows
+        self._counter = 0
+        self._columns = list(self.cget('columns'))
+
+        self.bind('<Configure>', self._on_configure, True)
+        self.bind('<<TreeviewSelect>>', self._on_select, True)
+        self.bind('<4>', lambda e: self._scroll(-3))
+        self.bind('<5>', lambda e: self._scroll(3))
+        self.bind('<MouseWheel>', lambda e: self._scroll(-3 if e.delta > 0 else 3))
+        self.bind('<Up>', lambda e: self._move_selection(-1))
+        self.bind('<Down>', lambda e: self._move_selection(1))
+        self.bind('<Prior>', lambda e: self._scroll(-len(self._rows)))
+        self.bind('<Next>', lambda e: self._scroll(len(self._rows)))
+        self.bind('<Home>', lambda e: self._scroll(-len(self._order)))
+        self.bind('<End>', lambda e: self._scroll(len(self._order)))
+
+    # --- configuration
+    def configure(self, cnf={}, **kw):
+        kw.update(cnf)
+        if 'yscrollcommand' in kw:
+            self._yscrollcommand = kw.pop('yscrollcommand')
+            self._update_scrollbar()
+        if 'valuescommand' in kw:
+            self._valuescommand = kw.pop('valuescommand')
+        if 'stripes' in kw:
+            self._stripes = tuple(kw.pop('stripes'))
+            self._render()
+        res = ttk.Treeview.configure(self, **kw)
+        if 'columns' in kw:
+            self._columns = list(self.cget('columns'))
+        return res
+
+    config = configure
+
+    def cget(self, key):
+        if key == 'yscrollcommand':
+            return self._yscrollcommand
+        elif key == 'valuescommand':
+            return self._valuescommand
+        elif key == 'stripes':
+            return self._stripes
+        return ttk.Treeview.cget(self, key)
+
+    def keys(self):
+        return ttk.Treeview.keys(self) + ['valuescommand', 'stripes']
+
+    # --- display
+    def _get_values(self, iid):
+        item = self._items[iid]
+        if 'values' not in item:
+            item['values'] = self._valuescommand(iid) if self._valuescommand else ()
+        return item['values']
+
+    def _index_items(self):
+        if self._pos is None:
+            self._pos = {iid: i for i, iid in enumerate(self._order)}
+
+    def _on_configure(self, event=None):
+        rowheight = 20
+        header = 0
+        if self._rows:
+            bbox = ttk.Treeview.bbox(self, self._rows[0])
+            if bbox:
+                header, rowheight = bbox[1], bbox[3]
+        else:
+            style = self.cget('style') or 'Treeview'
+            try:
+                rowheight = int(ttk.Style(self).lookup(style, 'rowheight')) or rowheight
+            except (ValueError, tk.TclError):
+                pass
+        nb = max(1, (self.winfo_height() - header) // rowheight)
+        while len(self._rows) < nb:
+            row = ttk.Treeview.insert(self, '', 'end')
+            self._rows.append(row)
+        if len(self._rows) > nb:
+            ttk.Treeview.delete(self, *self._rows[nb:])
+            for row in self._rows[nb:]:
+                self._row_iids.pop(row, None)
+                self._row_state.pop(row, None)
+            del self._rows[nb:]
+        ttk.Treeview.yview(self, 'moveto', 0)
+        self._render()
+
+    def _render(self):
+        """Display the visible items in the rows, updating only the changed rows."""
+        n = len(self._order)
+        nb = len(self._rows)
+        self._first = max(0, min(self._first, n - nb))
+        nb_stripes = len(self._stripes)
+        changes = []
+        selected = []
+        for k, row in enumerate(self._rows):
+            i = self._first + k
+            if i < n:
+                iid = self._order[i]
+                tags = self._items[iid]['tags']
+                if nb_stripes:
+                    tags = tuple(tags) + (self._stripes[i % nb_stripes],)
+                state = (self._get_values(iid), tags)
+                self._row_iids[row] = iid
+                if iid in self._sel:
+                    selected.append(row)
+            else:
+                state = ((), ())
+                self._row_iids.pop(row, None)
+            if self._row_state.get(row) != state:
+                self._row_state[row] = state
+                changes.extend((row,) + state)
+        if changes or self._row_sel.symmetric_difference(selected):
+            self._row_sel = set(selected)
+            self.tk.call('::vtreeview::render', self._w, changes, selected)
+        self._update_scrollbar()
+
+    def _refresh(self, iid):
+        """Redisplay item iid if visible."""
+        if iid in self._row_iids.values():
+            self._render()
+
+    def _update_scrollbar(self):
+        if self._yscrollcommand is None:
+            return
+        lo, hi = self.yview()
+        self._yscrollcommand(lo, hi)
+
+    def _scroll(self, nb):
+        self.yview('scroll', nb, 'units')
+        return 'break'
+
+    def _move_selection(self, step):
+        if not self._order:
+            return 'break'
+        self._index_items()
+        sel = [self._pos[iid] for iid in self._sel if iid in self._pos]
+        if sel:
+            i = min(sel) if step < 0 else max(sel)
+            i = max(0, min(i + step, len(self._order) - 1))
+        else:
+            i = self._first
+        self.selection_set(self._order[i])
+        self.see(self._order[i])
+        return 'break'
+
+    def _on_select(self, event):
+        visible = set(self._row_iids.values())
+        self._row_sel = set(ttk.Treeview.selection(self))
+        selected = {self._row_iids[row] for row in self._row_sel
+                    if row in self._row_iids}
+        self._sel = (self._sel - visible) | selected
+
+    # --- scrolling
+    def yview(self, *args):
+        n = len(self._order)
+        nb = len(self._rows)
+        if not args:
+            if n == 0:
+                return 0.0, 1.0
+            return self._first / n, min(1.0, (self._first + nb) / n)
+        if args[0] == 'moveto':
+            self._first = int(round(float(args[1]) * n))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= nb
+            self._first += step
+        self._render()
+
+    def see(self, item):
+        self._index_items()
+        i = self._pos[item]
+        if i < self._first:
+            self._first = i
+            self._render()
+        elif i >= self._first + len(self._rows):
+            self._first = i - len(self._rows) + 1
+            self._render()
+
+    def identify_row(self, y):
+        row = ttk.Treeview.identify_row(self, y)
+        return self._row_iids.get(row, '')
+
+    # --- items
+    def insert(self, parent, index, iid=None, **kw):
+        if parent:
+            raise ValueError('VirtualTreeview items cannot have children.')
+        if iid is None:
+            self._counter += 1
+            iid = 'I%i' % self._counter
+            while iid in self._items:
+                self._counter += 1
+                iid = 'I%i' % self._counter
+        elif iid in self._items:
+            raise tk.TclError('Item %s already exists' % iid)
+        item = {'tags': kw.get('tags', ())}
+        if 'values' in kw:
+            item['values'] = kw['values']
+        if isinstance(item['tags'], str):
+            item['tags'] = tuple(item['tags'].split())
+        self._items[iid] = item
+        index = self._normalize_index(index)
+        if index == len(self._order):
+            if self._pos is not None:
+                self._pos[iid] = len(self._order)
+            self._order.append(iid)
+            if len(self._order) - self._first <= len(self._rows):
+                self._render()
+            else:
+                self._update_scrollbar()
+        else:
+            self._order.insert(index, iid)
+            self._pos = None
+            self._render()
+        return iid
+
+    def item(self, item, option=None, **kw):
+        prop = self._items[item]
+        if option is not None:
+            if option == 'values':
+                return self._get_values(item)
+            return prop.get(option, '')
+        if not kw:
+            return {'values': self._get_values(item), 'tags': prop['tags']}
+        if 'values' in kw:
+            prop['values'] = kw['values']
+        if 'tags' in kw:
+            tags = kw['tags']
+            if isinstance(tags, str):
+                tags = tuple(tags.split())
+            prop['tags'] = tags
+        self._refresh(item)
+
+    def set(self, item, column=None, value=None):
+        values = self._get_values(item)
+        if column is None:
+            return dict(zip(self._columns, values))
+        if column.startswith('#'):
+            i = int(column[1:]) - 1
+        else:
+            i = self._columns.index(column)
+        if value is None:
+            return values[i]
+        values = list(values)
+        values[i] = value
+        self.item(item, values=values)
+
+    def exists(self, item):
+        return item in self._items
+
+    def index(self, item):
+        self._index_items()
+        return self._pos[item]
+
+    def get_children(self, item=''):
+        return tuple(self._order)
+
+    def set_children(self, item, *newchildren):
+        """Replace the attached items by newchildren, detaching the others."""
+        if len(newchildren) == 1 and isinstance(newchildren[0], (tuple, list)):
+            newchildren = newchildren[0]
+        self._order = list(newchildren)
+        self._pos = None
+        self._render()
+
+    def _normalize_index(self, index):
+        """Convert index to a position in the attached items, like ttk.Treeview."""
+        if index == 'end':
+            return len(self._order)
+        return max(0, min(int(index), len(self._order)))
+
+    def move(self, item, parent, index):
+        self._index_items()
+        if item in self._pos:
+            self._order.pop(self._pos[item])
+        self._order.insert(self._normalize_index(index), item)
+        self._pos = None
+        self._render()
+
+    reattach = move
+
+    def detach(self, *items):
+        items = set(items)
+        self._order = [iid for iid in self._order if iid not in items]
+        self._pos = None
+        self._render()
+
+    def delete(self, *items):
+        self.detach(*items)
+        for iid in items:
+            del self._items[iid]
+            self._sel.discard(iid)
+
+    # --- selection
+    def selection(self):
+        self._index_items()
+        return tuple(sorted((iid for iid in self._sel if iid in self._pos),
+                            key=self._pos.get))
+
+    def _selection(self, selop, items):
+        if len(items) == 1 and isinstance(items[0], (tuple, list)):
+            items = items[0]
+        items = {iid for iid in items if iid in self._items}
+        if selop == 'set':
+            self._sel = items
+        elif selop == 'add':
+            self._sel |= items
+        elif selop == 'remove':
+            self._sel -= items
+        else:
+            self._sel ^= items
+        self._render()
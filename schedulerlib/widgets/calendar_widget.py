@@ -38,8 +38,6 @@ class CalendarWidget(BaseWidget):
     def create_content(self, **kw):
         self._calendar = EventCalendar(self, **kw)
         self._calendar.pack(padx=1, pady=1)
-        for ev in self.master.events.values():
-            self._calendar.add_event(ev)
         # --- bindings
         self._calendar.bind('<3>', lambda e: self.menu.tk_popup(e.x_root, e.y_root))
         self.bind('<ButtonPress-1>', self._start_move)
@@ -73,11 +71,8 @@ class CalendarWidget(BaseWidget):
     def update_date(self):
         self._calendar.update_sel()
 
-    def add_event(self, event):
-        self._calendar.add_event(event)
-
-    def remove_event(self, event):
-        self._calendar.remove_event(event)
+    def update_events(self):
+        self._calendar.update_events()
 
     def get_events(self, date):
         return self._calendar.get_events(date)
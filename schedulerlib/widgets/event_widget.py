@@ -31,6 +31,7 @@ from .base_widget import BaseWidget
 
 class EventWidget(BaseWidget):
     def __init__(self, master):
+        self._rows = {}  # key: [widget, kind, text, desc, grid row, description label]
         BaseWidget.__init__(self, 'Events', master)
 
     def create_content(self, **kw):
@@ -104,39 +105,73 @@ class EventWidget(BaseWidget):
             pass  # triggered on start-up before canvas is created
         BaseWidget._on_configure(self, event)
 
-    def display_evts(self):
-
-        def wrap(event):
-            l = event.widget
-            if l.master.winfo_ismapped():
-                l.configure(wraplength=l.winfo_width())
+    @staticmethod
+    def _wrap(event):
+        l = event.widget
+        if l.master.winfo_ismapped():
+            l.configure(wraplength=l.winfo_width())
+
+    def _create_row(self, kind, text, desc, row):
+        """Create the widget displaying a day or an event."""
+        if kind == 'day':
+            widget = Label(self.display, text=text, style='day.Events.TLabel')
+            widget.grid(row=row, column=0, sticky='w', pady=(4, 0), padx=4)
+            desc_label = None
+        elif kind == 'toggle':
+            widget = ToggledFrame(self.display, text=text, style='Events.TFrame')
+            desc_label = Label(widget.interior, text=desc, style='Events.TLabel')
+            desc_label.pack(padx=4, fill='both', expand=True)
+            desc_label.configure(wraplength=desc_label.winfo_width())
+            desc_label.bind('<Configure>', self._wrap)
+            widget.grid(row=row, column=0, sticky='we', pady=2, padx=(8, 4))
+        else:
+            widget = Label(self.display, text=text, style='Events.TLabel')
+            widget.bind('<Configure>', self._wrap)
+            widget.grid(row=row, column=0, sticky='ew', pady=2, padx=(21, 10))
+            desc_label = None
+        return widget, desc_label
 
+    def display_evts(self):
+        """Update the displayed events, only changed rows are modified."""
         week = self.master.get_next_week_events()
         date_today = datetime.now().date()
-        today = date_today.strftime('%A')
-        children = list(self.display.children.values())
-        for ch in children:
-            ch.destroy()
 
+        # --- content to display: [(key, kind, text, desc), ...]
+        content = []
         for day, evts in week.items():
-            if day == today:
+            if day == date_today:
                 text = _('Today')
             else:
-                text = day.capitalize()
-            Label(self.display, text=text,
-                  style='day.Events.TLabel').grid(sticky='w', pady=(4, 0), padx=4)
-            for ev, desc in evts:
-                if desc.strip():
-                    tf = ToggledFrame(self.display, text=ev.strip(), style='Events.TFrame')
-                    l = Label(tf.interior,
-                              text=desc.strip(),
-                              style='Events.TLabel')
-                    l.pack(padx=4, fill='both', expand=True)
-                    l.configure(wraplength=l.winfo_width())
-                    l.bind('<Configure>', wrap)
-                    tf.grid(sticky='we', pady=2, padx=(8, 4))
+                text = day.strftime('%A').capitalize()
+            content.append((('day', day), 'day', text, ''))
+            for iid, ev, desc in evts:
+                desc = desc.strip()
+                kind = 'toggle' if desc else 'label'
+                content.append(((day, iid), kind, ev.strip(), desc))
+
+        # --- remove the rows no longer displayed (or whose kind changed)
+        kinds = {key: kind for key, kind, text, desc in content}
+        for key in list(self._rows):
+            if kinds.get(key) != self._rows[key][1]:
+                self._rows.pop(key)[0].destroy()
+
+        # --- add / update rows
+        for i, (key, kind, text, desc) in enumerate(content):
+            row = self._rows.get(key)
+            if row is None:
+                widget, desc_label = self._create_row(kind, text, desc, i)
+                self._rows[key] = [widget, kind, text, desc, i, desc_label]
+                continue
+            widget, kind, old_text, old_desc, old_i, desc_label = row
+            if text != old_text:
+                if kind == 'toggle':
+                    widget.label.configure(text=text)
                 else:
-                    l = Label(self.display, text=ev.strip(),
-                              style='Events.TLabel')
-                    l.bind('<Configure>', wrap)
-                    l.grid(sticky='ew', pady=2, padx=(21, 10))
+                    widget.configure(text=text)
+                row[2] = text
+            if desc != old_desc:
+                desc_label.configure(text=desc)
+                row[3] = desc
+            if i != old_i:
+                widget.grid_configure(row=i)
+                row[4] = i
@@ -21,7 +21,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Pomodoro widget
 """
 import logging
-import sqlite3
 import datetime as dt
 from subprocess import Popen
 from tkinter import StringVar, Menu, IntVar
@@ -30,9 +29,10 @@ from tkinter.messagebox import askyesno
 
 from PIL.ImageTk import PhotoImage
 
-from schedulerlib.pomodoro_stats import Stats
-from schedulerlib.constants import CONFIG, CMAP, PATH_STATS, IM_START, \
-    IM_STOP, IM_POMODORO, IM_GRAPH, active_color, scrub
+from schedulerlib.stats_db import STATS_DB
+from schedulerlib.clock import Countdown
+from schedulerlib.constants import CONFIG, CMAP, IM_START, \
+    IM_STOP, IM_POMODORO, IM_GRAPH, active_color
 from .base_widget import BaseWidget
 
 
@@ -92,7 +92,7 @@ class Pomodoro(BaseWidget):
         self.choose_task.pack(side="right", fill="x", pady=4)
 
         # --- display
-        self.tps = [CONFIG.getint("Pomodoro", "work_time"), 0]  # time: min, sec
+        self.countdown = Countdown(CONFIG.getint("Pomodoro", "work_time") * 60)
         self.activite = StringVar(self, _("Work"))
         self.titre = Label(self,
                            textvariable=self.activite,
@@ -101,7 +101,7 @@ class Pomodoro(BaseWidget):
                            anchor="center")
         self.titre.grid(row=0, column=0, columnspan=2, sticky="we", pady=(4, 0), padx=4)
         self.temps = Label(self,
-                           text="{0:02}:{1:02}".format(self.tps[0], self.tps[1]),
+                           text=self._format_time(),
                            style='timer.pomodoro.TLabel',
                            anchor="center")
         self.temps.grid(row=1, column=0, columnspan=2, sticky="nswe", padx=4)
@@ -214,36 +214,19 @@ class Pomodoro(BaseWidget):
             self._stats.destroy()
         BaseWidget.hide(self)
 
-    def stats(self, time=None):
+    def stats(self, seconds=None):
         """Save stats."""
-        if time is None:
-            time = CONFIG.getint("Pomodoro", "work_time")
-        today = dt.date.today().toordinal()
-        task = self.task.get().lower().replace(' ', '_')
-        db = sqlite3.connect(PATH_STATS)
-        cursor = db.cursor()
-        try:
-            cursor.execute('SELECT * FROM {} ORDER BY id DESC LIMIT 1'.format(scrub(task)))
-            key, date, work = cursor.fetchone()
-        except sqlite3.OperationalError:
-            cursor.execute('''CREATE TABLE {} (id INTEGER PRIMARY KEY,
-                                               date INTEGER,
-                                               work INTEGER)'''.format(scrub(task)))
-            cursor.execute('INSERT INTO {}(date, work) VALUES (?, ?)'.format(scrub(task)),
-                           (today, time))
-        else:
-            if today != date:
-                cursor.execute('INSERT INTO {}(date, work) VALUES (?, ?)'.format(scrub(task)),
-                               (today, time))
-            else:  # update day's value
-                cursor.execute('UPDATE {} SET work=? WHERE id=?'.format(scrub(task)), (work + time, key))
-        finally:
-            db.commit()
-            db.close()
+        if seconds is None:
+            seconds = CONFIG.getint("Pomodoro", "work_time") * 60
+        STATS_DB.add_time(self.task.get(), seconds, dt.date.today().toordinal())
+        if self._stats is not None:
+            self._stats.add_time(self.task.get(), seconds)
 
     def display_stats(self):
         """ affiche les statistiques """
         if self._stats is None:
+            # matplotlib is only loaded when needed
+            from schedulerlib.pomodoro_stats import Stats
             self._stats = Stats(self)
             self._stats.bind('<Destroy>', self._on_close_stats)
         else:
@@ -259,13 +242,16 @@ class Pomodoro(BaseWidget):
             self.on = True
             self.choose_task.state(["disabled"])
             self.b_go.configure(image=self.im_stop)
-            self.after(1000, self.affiche)
+            self.countdown.start()
+            self.master.ticks.add(self.affiche, self.countdown)
             logging.info('Start work cycle for task ' + self.task.get())
 
     def stop(self, confirmation=True):
         """ Arrête le décompte du temps et le réinitialise,
             demande une confirmation avant de le faire si confirmation=True """
-        tps = int(CONFIG.getint("Pomodoro", "work_time") - self.tps[0] - self.tps[1] / 60)
+        self.countdown.pause()
+        self.master.ticks.remove(self.affiche)
+        tps = int(self.countdown.elapsed())
         self.on = False
         rep = True
         if confirmation:
@@ -278,8 +264,8 @@ class Pomodoro(BaseWidget):
                 self.stats(tps)
             self.pomodori.set(0)
             self.nb_cycles = 0
-            self.tps = [CONFIG.getint("Pomodoro", "work_time"), 0]
-            self.temps.configure(text="{0:02}:{1:02}".format(self.tps[0], self.tps[1]))
+            self.countdown.reset(CONFIG.getint("Pomodoro", "work_time") * 60)
+            self.temps.configure(text=self._format_time())
             act = _("Work")
             self.activite.set(act)
             self.style.configure('timer.pomodoro.TLabel',
@@ -288,6 +274,8 @@ class Pomodoro(BaseWidget):
             logging.info('Pomodoro session interrupted.')
         else:
             self.on = True
+            self.countdown.start()
+            self.master.ticks.add(self.affiche, self.countdown)
             self.affiche()
         return rep
 
@@ -298,37 +286,33 @@ class Pomodoro(BaseWidget):
             Popen([CONFIG.get("General", "soundplayer"),
                    CONFIG.get("Pomodoro", "beep")])
 
+    def _format_time(self):
+        return "{0:02}:{1:02}".format(*divmod(self.countdown.remaining(), 60))
+
     def affiche(self):
         if self.on:
-            self.tps[1] -= 1
-            if self.tps[1] == 0:
-                if self.tps[0] == 0:
-                    self.ting()
-                    if self.activite.get() == _("Work"):
-                        self.pomodori.set(self.pomodori.get() + 1)
-                        self.nb_cycles += 1
-                        self.choose_task.state(["!disabled"])
-                        logging.info('Pomodoro: completed work session for task ' + self.task.get())
-                        if self.nb_cycles % 4 == 0:
-                            # pause longue
-                            self.stats()
-                            self.activite.set(_("Rest"))
-                            self.tps = [CONFIG.getint("Pomodoro", "rest_time"), 0]
-                        else:
-                            # pause courte
-                            self.stats()
-                            self.activite.set(_("Break"))
-                            self.tps = [CONFIG.getint("Pomodoro", "break_time"), 0]
+            if self.countdown.expired():
+                self.ting()
+                if self.activite.get() == _("Work"):
+                    self.pomodori.set(self.pomodori.get() + 1)
+                    self.nb_cycles += 1
+                    self.choose_task.state(["!disabled"])
+                    logging.info('Pomodoro: completed work session for task ' + self.task.get())
+                    self.stats()
+                    if self.nb_cycles % 4 == 0:
+                        # pause longue
+                        self.activite.set(_("Rest"))
+                        self.countdown.chain(CONFIG.getint("Pomodoro", "rest_time") * 60)
                     else:
-                        self.choose_task.state(["disabled"])
-                        self.activite.set(_("Work"))
-                        self.tps = [CONFIG.getint("Pomodoro", "work_time"), 0]
-                    act = self.activite.get()
-                    self.style.configure('timer.pomodoro.TLabel',
-                                         background=self.background[act],
-                                         foreground=self.foreground[act])
-            elif self.tps[1] == -1:
-                self.tps[0] -= 1
-                self.tps[1] = 59
-            self.temps.configure(text="{0:02}:{1:02}".format(*self.tps))
-            self.after(1000, self.affiche)
+                        # pause courte
+                        self.activite.set(_("Break"))
+                        self.countdown.chain(CONFIG.getint("Pomodoro", "break_time") * 60)
+                else:
+                    self.choose_task.state(["disabled"])
+                    self.activite.set(_("Work"))
+                    self.countdown.chain(CONFIG.getint("Pomodoro", "work_time") * 60)
+                act = self.activite.get()
+                self.style.configure('timer.pomodoro.TLabel',
+                                     background=self.background[act],
+                                     foreground=self.foreground[act])
+            self.temps.configure(text=self._format_time())
@@ -27,6 +27,7 @@ from tkinter.ttk import Button, Label, Sizegrip
 from PIL.ImageTk import PhotoImage
 
 from schedulerlib.constants import IM_START, IM_PAUSE, IM_STOP, CONFIG, active_color
+from schedulerlib.clock import Stopwatch
 from .base_widget import BaseWidget
 
 
@@ -37,9 +38,8 @@ class Timer(BaseWidget):
     def create_content(self, **kw):
         self.minsize(50, 120)
 
-        self._time = [0, 0, 0]
+        self._stopwatch = Stopwatch()
         self._on = False
-        self._after_id = ''
 
         self.img_play = PhotoImage(master=self, file=IM_START)
         self.img_pause = PhotoImage(master=self, file=IM_PAUSE)
@@ -50,7 +50,7 @@ class Timer(BaseWidget):
         self.columnconfigure(1, weight=1)
 
         # --- GUI elements
-        self.display = Label(self, text='%i:%.2i:%.2i' % tuple(self._time),
+        self.display = Label(self, text=self._format_time(),
                              anchor='center',
                              style='timer.TLabel')
         self.intervals = Text(self, highlightthickness=0, relief='flat',
@@ -129,31 +129,31 @@ class Timer(BaseWidget):
         self.withdraw()
         self.deiconify()
 
+    def _format_time(self):
+        m, s = divmod(int(self._stopwatch.elapsed()), 60)
+        h, m = divmod(m, 60)
+        return '%i:%.2i:%.2i' % (h, m, s)
+
     def _run(self):
         if self._on:
-            self._time[2] += 1
-            if self._time[2] == 60:
-                self._time[2] = 0
-                self._time[1] += 1
-                if self._time[1] == 60:
-                    self._time[1] = 0
-                    self._time[0] += 1
-            self.display.configure(text='%i:%.2i:%.2i' % tuple(self._time))
-            self._after_id = self.after(1000, self._run)
+            self.display.configure(text=self._format_time())
 
     def launch(self):
         if self._on:
             self._on = False
+            self._stopwatch.pause()
+            self.master.ticks.remove(self._run)
             self.b_launch.configure(image=self.img_play)
             self.b_interv.state(('disabled',))
         else:
             self._on = True
+            self._stopwatch.start()
+            self.master.ticks.add(self._run, self._stopwatch)
             self.b_interv.state(('!disabled',))
             self.b_launch.configure(image=self.img_pause)
-            self.after(1000, self._run)
 
     def add_interval(self):
-        tps = '\n%i:%.2i:%.2i' % tuple(self._time)
+        tps = '\n' + self._format_time()
         if self.intervals.get('1.0', 'end') == '\n':
             tps = tps[1:]
         self.intervals.configure(state='normal')
@@ -162,10 +162,11 @@ class Timer(BaseWidget):
 
     def stop(self):
         self._on = False
+        self._stopwatch.reset()
+        self.master.ticks.remove(self._run)
         self.b_interv.state(('disabled',))
         self.b_launch.configure(image=self.img_play)
-        self._time = [0, 0, 0]
         self.intervals.configure(state='normal')
         self.intervals.delete('1.0', 'end')
         self.intervals.configure(state='disabled')
-        self.display.configure(text='%i:%.2i:%.2i' % tuple(self._time))
+        self.display.configure(text=self._format_time())
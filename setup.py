@@ -49,6 +49,6 @@ setup(name='scheduler',
                 'schedulerlib.settings'],
       package_data={'schedulerlib': ['packages.tcl']},
       scripts=["scheduler"],
-      install_requires=["APScheduler", "sqlalchemy", "Pillow", "ewmh",
-                        "matplotlib", "numpy", "babel", "tkcalendar",
-                        "python-dateutil"])
+      entry_points={'apscheduler.jobstores': ['scheduler_sqlite = schedulerlib.jobstore:SQLiteJobStore']},
+      install_requires=["APScheduler", "Pillow", "ewmh",
+                        "matplotlib", "numpy", "babel", "tkcalendar"])
@@ -0,0 +1,81 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Scheduler - Task scheduling and calendar
+Copyright 2017-2019 Juliette Monsel <j_4321@protonmail.com>
+
+Scheduler is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Scheduler is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Tests of the reminders' job store
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from schedulerlib.jobstore import SQLiteJobStore
+
+
+def job_function(text):
+    pass
+
+
+class TestSQLiteJobStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store = SQLiteJobStore(os.path.join(self.dir.name, 'jobs.sqlite'))
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.add_jobstore(self.store)
+        self.scheduler.start(paused=True)
+        self.date = datetime.now() + timedelta(days=1)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        self.dir.cleanup()
+
+    def add_job(self, text):
+        return self.scheduler.add_job(job_function, 'date', run_date=self.date, args=(text,)).id
+
+    def stored_ids(self):
+        return {row[0] for row in self.store.db.execute('SELECT id FROM jobs')}
+
+    def test_batch(self):
+        kept = self.add_job('kept')
+        removed = self.add_job('removed')
+        with self.store.batch():
+            added = self.add_job('added')
+            self.scheduler.remove_job(removed)
+            # the batch is visible to the thread making it, not yet written
+            self.assertEqual({job.id for job in self.scheduler.get_jobs()}, {kept, added})
+            self.assertIsNone(self.scheduler.get_job(removed))
+            self.assertEqual(self.stored_ids(), {kept, removed})
+        self.assertEqual(self.stored_ids(), {kept, added})
+
+    def test_failing_batch(self):
+        removed = self.add_job('removed')
+        with self.assertRaises(ValueError):
+            with self.store.batch():
+                added = self.add_job('added')
+                self.scheduler.remove_job(removed)
+                raise ValueError
+        # the modifications made before the error are written
+        self.assertEqual(self.stored_ids(), {added})
+        self.assertEqual([job.args for job in self.scheduler.get_jobs()], [('added',)])
+
+
+if __name__ == '__main__':
+    unittest.main()